@@ -3,7 +3,7 @@ from tkinter import ttk
 import os
 import threading
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import tempfile
 import shutil
 import subprocess
@@ -12,7 +12,24 @@ from logging.handlers import RotatingFileHandler
 import gc
 import re
 import hashlib
-from PIL import Image, ImageTk
+import io
+import colorsys
+import mmap
+import struct
+from collections import OrderedDict
+import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import heapq
+import signal
+import argparse
+import select
+import statistics
+import json
+import sqlite3
+import zipfile
+from xml.etree import ElementTree
+from urllib.parse import quote
+from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageChops, ImageStat
 
 LOG_FILE = "/var/log/pi-photo-viewer/app.log"
 logger = logging.getLogger(__name__)
@@ -45,10 +62,116 @@ EXCLUDED_MODEL_FOLDERS = {
 }
 
 SUPPORTED_FORMATS = (".xlsx", ".png", ".jpg", ".jpeg", ".gif", ".bmp")
+# Render-index "sheet" name used for screen-sized copies of plain image files
+IMAGE_SHEET = "Image"
 LOGO_WIDTH = 175
-IMAGE_CACHE_SIZE = 20  # Increased from 2 to 20 - keeps 10 files (front+back) in memory
+# Memory cache budget: IMAGE_CACHE_MEMORY_FRACTION of available RAM, clamped
+# to [MIN, MAX] MB and halved while PSI "some avg10" memory stall >= PSI_LIMIT %
+IMAGE_CACHE_MEMORY_FRACTION = 0.25
+IMAGE_CACHE_MIN_MB = 32
+IMAGE_CACHE_MAX_MB = 1024
+IMAGE_CACHE_PSI_LIMIT = 10.0
+IMAGE_CACHE_ADJUST_INTERVAL = 30
 MAX_IMAGE_DIMENSION = 1920
+UPDATED_INDICATOR_MS = 4000
 CACHE_STALE_DAYS = 7
+# Render cache lives on the SD card so it survives reboots (/tmp is cleared at boot)
+CACHE_DIR = "/var/cache/pi-photo-viewer"
+FALLBACK_CACHE_DIR = os.path.expanduser("~/.cache/pi-photo-viewer")
+WARM_START_PAGES = 10
+# Optional raw-pixel cache format: renders are stored as uncompressed RGBA
+# (about 8 MB per 1920x1000 page instead of ~300 KB PNG) and loaded via mmap
+# without decoding. Trades SD card space for near-zero page switch cost.
+RAW_PIXEL_CACHE = False
+RAW_PIXEL_MAGIC = b"OPSRGBA1"
+RAW_PIXEL_HEADER = struct.Struct("<8sII")
+CACHE_ARTIFACT_EXTENSIONS = (".png", ".rgba")
+# Renders are keyed by a content fingerprint (size + SHA-1 of the first and
+# last FINGERPRINT_CHUNK bytes and the zip central directory), so copies and
+# moved workbooks share one render
+FINGERPRINT_CHUNK = 64 * 1024
+FINGERPRINT_MAX_DIRECTORY = 4 * 1024 * 1024
+
+# Disk render cache budget: evict once usage passes the quota or free space on
+# the card drops below DISK_CACHE_MIN_FREE_MB. Each cache hit buys an entry
+# DISK_CACHE_HIT_BONUS seconds of extra retention over plain LRU.
+DISK_CACHE_QUOTA_MB = 2048
+DISK_CACHE_MIN_FREE_MB = 1024
+DISK_CACHE_HIT_BONUS = 3600
+DISK_CACHE_SWEEP_INTERVAL = 6 * 3600
+
+# Persistent headless office workers (requires python3-uno; falls back to one
+# cold libreoffice process per conversion when UNO is not available)
+OFFICE_WORKER_MAX_JOBS = 50
+OFFICE_JOB_TIMEOUT = 45
+OFFICE_STARTUP_TIMEOUT = 30
+
+# Parallel conversion budget. CONVERSION_WORKERS = None sizes the pool from
+# the CPU count (keeping CONVERSION_CPU_RESERVE cores for the UI) and from
+# MemAvailable at startup; an explicit number still gets capped by memory.
+CONVERSION_WORKERS = None
+CONVERSION_CPU_RESERVE = 1
+CONVERSION_WORKER_MEMORY_MB = 300
+CONVERSION_MIN_FREE_MB = 200
+CONVERSION_NICE = 10
+
+# Precache a model folder with one libreoffice invocation for all its changed
+# workbooks (cold path only; the UNO worker pool already stays resident)
+BATCH_FOLDER_CONVERSION = True
+
+# Share listings are served from memory and re-validated (one stat per
+# folder, full re-list only when the folder mtime changed) at most this often
+SHARE_CATALOG_REVALIDATE = 30
+
+# Share health monitor: wakes on mount table changes (/proc/self/mountinfo)
+# and every SHARE_PROBE_INTERVAL seconds, probes the share with a deadline of
+# SHARE_PROBE_TIMEOUT seconds and reports it degraded while the median of the
+# last SHARE_LATENCY_WINDOW probe latencies is at or above SHARE_DEGRADED_LATENCY
+SHARE_PROBE_INTERVAL = 10
+SHARE_PROBE_TIMEOUT = 5
+SHARE_DEGRADED_LATENCY = 1.0
+SHARE_LATENCY_WINDOW = 5
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+# All reads of the share (stats, listings, file contents) go through one
+# bounded executor with a deadline per operation type (seconds). After
+# SHARE_IO_BREAKER_THRESHOLD consecutive timeouts the circuit opens and share
+# calls fail at once for SHARE_IO_BREAKER_COOLDOWN seconds.
+SHARE_IO_WORKERS = 6
+SHARE_IO_DEADLINES = {"stat": 5, "list": 10, "read": 20, "image": 30, "workbook": 30}
+SHARE_IO_BREAKER_THRESHOLD = 3
+SHARE_IO_BREAKER_COOLDOWN = 30
+
+# Failed renders are retried after FAILURE_BACKOFF_BASE seconds, doubling per
+# consecutive failure up to FAILURE_BACKOFF_MAX. Failures and missing sheets
+# are keyed by content fingerprint, so a fixed or replaced file retries at once.
+FAILURE_BACKOFF_BASE = 15 * 60
+FAILURE_BACKOFF_MAX = 7 * 24 * 3600
+
+# Conversion scheduler priority classes (lower runs first)
+PRIORITY_VISIBLE = 0
+PRIORITY_MODEL = 1
+PRIORITY_DEPT = 2
+PRIORITY_BACKGROUND = 3
+
+XLSX_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DRAWINGML_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+# In-process sheet renderer (openpyxl + PIL) for plain layout sheets: cells,
+# merged ranges, solid fills, borders, text and embedded pictures. Sheets using
+# anything else (charts, shapes, conditional formatting, rotated text, ...)
+# are exported through LibreOffice as before.
+DIRECT_RENDER = True
+DIRECT_RENDER_FONTS = {
+    "regular": ["/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"],
+    "bold": ["/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+             "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"],
+    "italic": ["/usr/share/fonts/truetype/liberation/LiberationSans-Italic.ttf",
+               "/usr/share/fonts/truetype/dejavu/DejaVuSans-Oblique.ttf"],
+    "bolditalic": ["/usr/share/fonts/truetype/liberation/LiberationSans-BoldItalic.ttf",
+                   "/usr/share/fonts/truetype/dejavu/DejaVuSans-BoldOblique.ttf"],
+}
 
 SHEET_MAPPING = {
     "front": ["front", "front page", "proposal"],
@@ -276,258 +399,2824 @@ class TouchDropdown(tk.Frame):
         return "normal" if self.enabled else "disabled"
 
 class ImageCache:
-    def __init__(self, max_size=IMAGE_CACHE_SIZE):
-        self.cache = {}
-        self.max_size = max_size
-        self.order = []
-        logger.info(f"Memory cache initialized (max size: {max_size} images)")
+    """Decoded-image memory cache bounded by bytes, with O(1) LRU operations.
+    
+    The byte budget is a share of the RAM that is actually available
+    (MemAvailable), halved while the kernel reports memory pressure (PSI),
+    and re-evaluated at most every IMAGE_CACHE_ADJUST_INTERVAL seconds.
+    """
+    
+    def __init__(self, budget_bytes=None):
+        self.cache = OrderedDict()
+        self.sizes = {}
+        self.used_bytes = 0
+        self.fixed_budget = budget_bytes
+        self.budget_bytes = budget_bytes or IMAGE_CACHE_MIN_MB * 1024 * 1024
+        self.last_adjust = 0.0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.adjust_budget(force=True)
+        logger.info(f"Memory cache initialized (budget: {self.budget_bytes / 1048576:.0f} MB)")
+    
+    def adjust_budget(self, force=False):
+        """Size the budget from MemAvailable and memory pressure"""
+        if self.fixed_budget:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_adjust < IMAGE_CACHE_ADJUST_INTERVAL:
+            return
+        self.last_adjust = now
+        
+        free_mb = available_memory_mb()
+        if free_mb is None:
+            return
+        # Memory we already hold counts as available to us
+        budget_mb = (free_mb + self.used_bytes / 1048576) * IMAGE_CACHE_MEMORY_FRACTION
+        pressure = memory_pressure()
+        if pressure is not None and pressure >= IMAGE_CACHE_PSI_LIMIT:
+            budget_mb /= 2
+            logger.info(f"Memory pressure {pressure:.1f}% - halving image cache budget")
+        budget_mb = min(max(budget_mb, IMAGE_CACHE_MIN_MB), IMAGE_CACHE_MAX_MB)
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
     
     def get(self, path):
-        if path in self.cache:
-            self.order.remove(path)
-            self.order.append(path)
-            logger.info(f"[INSTANT LOAD] Memory cache hit - displaying immediately!")
-            return self.cache[path]
-        return None
+        with self.lock:
+            photo = self.cache.get(path)
+            if photo is None:
+                self.misses += 1
+                return None
+            self.cache.move_to_end(path)
+            self.hits += 1
+        logger.info(f"[INSTANT LOAD] Memory cache hit - displaying immediately!")
+        return photo
     
-    def put(self, path, photo):
-        if path in self.cache:
-            self.order.remove(path)
-        elif len(self.cache) >= self.max_size:
-            removed = self.order.pop(0)
-            if removed in self.cache:
+    def put(self, path, photo, nbytes=None):
+        if nbytes is None:
+            # Tk keeps photo images as 32-bit pixels
+            nbytes = photo.width() * photo.height() * 4
+        with self.lock:
+            self.adjust_budget()
+            if path in self.cache:
+                self.used_bytes -= self.sizes[path]
+            self.cache[path] = photo
+            self.cache.move_to_end(path)
+            self.sizes[path] = nbytes
+            self.used_bytes += nbytes
+            
+            while self.used_bytes > self.budget_bytes and len(self.cache) > 1:
+                removed, _ = self.cache.popitem(last=False)
+                self.used_bytes -= self.sizes.pop(removed)
+                self.evictions += 1
                 logger.debug(f"Evicting from cache: {removed}")
-                del self.cache[removed]
+        logger.debug(f"Memory cache now holds {len(self.cache)} images, "
+                     f"{self.used_bytes / 1048576:.1f}/{self.budget_bytes / 1048576:.0f} MB")
+    
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.cache), "bytes": self.used_bytes, "budget_bytes": self.budget_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def write_raw_pixels(img, path):
+    """Store an image as a header plus ready-to-blit RGBA rows"""
+    img = img.convert("RGBA")
+    with open(path, "wb") as f:
+        f.write(RAW_PIXEL_HEADER.pack(RAW_PIXEL_MAGIC, img.width, img.height))
+        f.write(img.tobytes("raw", "RGBA"))
+
+
+def load_raw_pixels(path):
+    """Map a raw-pixel file and wrap it as an image without copying or decoding.
+    
+    The mapping stays alive for as long as the returned image references it.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height = RAW_PIXEL_HEADER.unpack_from(mapped)
+    if magic != RAW_PIXEL_MAGIC or len(mapped) != RAW_PIXEL_HEADER.size + width * height * 4:
+        mapped.close()
+        raise ValueError(f"Not a raw pixel cache file: {path}")
+    pixels = memoryview(mapped)[RAW_PIXEL_HEADER.size:]
+    return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+
+def resolve_cache_dir():
+    """First writable persistent cache location"""
+    for path in (CACHE_DIR, FALLBACK_CACHE_DIR):
+        try:
+            os.makedirs(path, exist_ok=True)
+            if os.access(path, os.W_OK):
+                return path
+        except OSError:
+            continue
+    logger.warning("No persistent cache location writable - falling back to /tmp")
+    return "/tmp/pi-photo-viewer-cache"
+
+
+def durable_replace(temp_path, final_path):
+    """Atomically move a finished temp file into place and flush it to disk.
+    
+    temp_path must be on the same filesystem, so a crash leaves either the
+    old file or the complete new one, never a truncated one.
+    """
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, final_path)
+    dir_fd = os.open(os.path.dirname(final_path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def content_fingerprint(path):
+    """Cheap content fingerprint: size plus a hash of head, tail and zip central directory.
+    
+    The central directory of an xlsx lists the CRC-32 of every member, so an
+    edit anywhere in the workbook changes it without reading the whole file.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.sha1(f.read(FINGERPRINT_CHUNK))
+        if size > FINGERPRINT_CHUNK:
+            f.seek(max(FINGERPRINT_CHUNK, size - FINGERPRINT_CHUNK))
+            tail = f.read()
+            digest.update(tail)
+            eocd = tail.rfind(b"PK\x05\x06")
+            if 0 <= eocd <= len(tail) - 22:
+                directory_size, directory_offset = struct.unpack_from("<II", tail, eocd + 12)
+                if directory_size <= FINGERPRINT_MAX_DIRECTORY and directory_offset + directory_size <= size:
+                    f.seek(directory_offset)
+                    digest.update(f.read(directory_size))
+    return f"{size}-{digest.hexdigest()}"
+
+
+def sheet_fingerprints(excel_path, sheet_names):
+    """Per-sheet content keys for an xlsx: {sheet_name: key}.
+    
+    A key covers the sheet part, its print area and other defined names, the
+    shared strings it references, styles and theme, and every part reachable
+    through the sheet's relationships (drawings, media, charts, comments).
+    Parts are compared by their zip CRC-32, so only the sheet XML and shared
+    strings have to be read.
+    """
+    rel_ns = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+    rid_attr = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+    
+    def rels_path(part):
+        folder, name = part.rsplit("/", 1)
+        return f"{folder}/_rels/{name}.rels"
+    
+    def resolve(part, target):
+        if target.startswith("/"):
+            return target.lstrip("/")
+        parts = part.rsplit("/", 1)[0].split("/")
+        for piece in target.split("/"):
+            if piece == "..":
+                parts.pop()
+            elif piece and piece != ".":
+                parts.append(piece)
+        return "/".join(parts)
+    
+    def relationships(archive, part):
+        try:
+            root = ElementTree.fromstring(archive.read(rels_path(part)))
+        except KeyError:
+            return {}
+        return {rel.get("Id"): resolve(part, rel.get("Target")) for rel in root.iter(f"{rel_ns}Relationship")
+                if rel.get("TargetMode") != "External"}
+    
+    with zipfile.ZipFile(excel_path) as archive:
+        crcs = {info.filename: info.CRC for info in archive.infolist()}
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        workbook_rels = relationships(archive, "xl/workbook.xml")
+        sheets = list(workbook.iter(f"{{{XLSX_MAIN_NS}}}sheet"))
+        defined_names = [(name.get("localSheetId"), name.get("name"), name.text or "")
+                         for name in workbook.iter(f"{{{XLSX_MAIN_NS}}}definedName")]
+        shared_parts = sorted(name for name in crcs if name.startswith(("xl/styles.xml", "xl/theme/")))
+        
+        keys = {}
+        shared_refs = {}
+        for index, sheet in enumerate(sheets):
+            name = sheet.get("name")
+            if name not in sheet_names:
+                continue
+            part = workbook_rels.get(sheet.get(rid_attr))
+            if part not in crcs:
+                continue
+            digest = hashlib.sha1(f"{name}|{sheet.get('state')}".encode())
+            for local_id, defined, text in defined_names:
+                if local_id == str(index) or name in text:
+                    digest.update(f"{local_id}|{defined}|{text}".encode())
+            # Everything the sheet links to, transitively
+            seen, stack = set(), [part]
+            while stack:
+                current = stack.pop()
+                if current in seen or current not in crcs:
+                    continue
+                seen.add(current)
+                stack.extend(relationships(archive, current).values())
+            for linked in sorted(seen | set(shared_parts)):
+                digest.update(f"{linked}:{crcs[linked]}".encode())
+            
+            refs = set()
+            for _, cell in ElementTree.iterparse(archive.open(part)):
+                if cell.tag == f"{{{XLSX_MAIN_NS}}}c":
+                    value = cell.find(f"{{{XLSX_MAIN_NS}}}v")
+                    if cell.get("t") == "s" and value is not None and value.text:
+                        refs.add(int(value.text))
+                    cell.clear()
+            keys[name] = digest
+            shared_refs[name] = refs
+        
+        # Only the shared strings a sheet actually shows count towards its key
+        wanted = set().union(*shared_refs.values()) if shared_refs else set()
+        strings = {}
+        if wanted and "xl/sharedStrings.xml" in crcs:
+            index = 0
+            for _, item in ElementTree.iterparse(archive.open("xl/sharedStrings.xml")):
+                if item.tag == f"{{{XLSX_MAIN_NS}}}si":
+                    if index in wanted:
+                        strings[index] = ElementTree.tostring(item)
+                    index += 1
+                    item.clear()
+    
+    result = {}
+    for name, digest in keys.items():
+        for ref in sorted(shared_refs[name]):
+            digest.update(b"%d:" % ref + strings.get(ref, b""))
+        result[name] = digest.hexdigest()
+    return result
+
+
+def read_meminfo():
+    """Return /proc/meminfo as {field: kB}"""
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                info[name] = int(value.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return info
+
+
+def memory_pressure():
+    """PSI "some avg10" for memory (percent of time stalled), or None if unsupported"""
+    try:
+        with open("/proc/pressure/memory") as f:
+            for line in f:
+                if line.startswith("some"):
+                    for field in line.split()[1:]:
+                        name, _, value = field.partition("=")
+                        if name == "avg10":
+                            return float(value)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_memory_mb():
+    kb = read_meminfo().get("MemAvailable")
+    return kb // 1024 if kb is not None else None
+
+
+def conversion_worker_budget(requested=CONVERSION_WORKERS):
+    """Number of parallel conversion workers the CPU and memory budget allows"""
+    cpu_budget = max(1, (os.cpu_count() or 1) - CONVERSION_CPU_RESERVE)
+    workers = cpu_budget if requested is None else max(1, requested)
+    free_mb = available_memory_mb()
+    if free_mb is not None:
+        memory_budget = max(1, (free_mb - CONVERSION_MIN_FREE_MB) // CONVERSION_WORKER_MEMORY_MB)
+        workers = min(workers, memory_budget)
+    return workers
+
+
+def niced(cmd):
+    """Prefix cmd with nice so conversions never starve the UI thread"""
+    if CONVERSION_NICE and shutil.which("nice"):
+        return ["nice", "-n", str(CONVERSION_NICE)] + list(cmd)
+    return list(cmd)
+
+
+class ConversionCancelled(Exception):
+    """Raised when a conversion is stopped through its stop_event."""
+
+
+class OfficeUnavailable(Exception):
+    """Raised when no office process can be started - not the workbook's fault."""
+
+
+def run_cancellable(cmd, timeout, stop_event=None):
+    """Run cmd in its own process group, killing the whole group on cancel or timeout"""
+    process = subprocess.Popen(niced(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               start_new_session=True)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=0.1)
+                return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                pass
+            if stop_event and stop_event.is_set():
+                raise ConversionCancelled(os.path.basename(cmd[0]))
+            if time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            process.communicate()
+
+
+class OfficeWorker:
+    """One long-lived headless LibreOffice process with its own user profile."""
+
+    def __init__(self, worker_id, profile_root):
+        self.worker_id = worker_id
+        self.profile_dir = os.path.join(profile_root, f"worker-{worker_id}")
+        self.pipe_name = f"opstandard_{os.getpid()}_{worker_id}"
+        self.process = None
+        self.desktop = None
+        self.jobs_done = 0
+        self.job_started = None
+        self.cancel_event = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Launch soffice on a private pipe and connect to it over UNO"""
+        import uno
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        cmd = ["soffice", "--headless", "--invisible", "--nocrashreport",
+               "--nodefault", "--nofirststartwizard", "--nologo", "--norestore",
+               f"-env:UserInstallation={uno.systemPathToFileUrl(self.profile_dir)}",
+               f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"]
+        self.process = subprocess.Popen(niced(cmd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        start_new_session=True)
+        self.jobs_done = 0
+
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx)
+        deadline = time.monotonic() + OFFICE_STARTUP_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext")
+                self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+                logger.info(f"Office worker {self.worker_id} ready (pid {self.process.pid})")
+                return
+            except Exception:
+                if not self.is_alive() or time.monotonic() > deadline:
+                    self.kill()
+                    raise RuntimeError(f"Office worker {self.worker_id} failed to start")
+                time.sleep(0.5)
+
+    def kill(self):
+        """Hard-kill the worker's whole process group"""
+        if self.process is not None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            try:
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+        self.process = None
+        self.desktop = None
+        self.job_started = None
+
+    def export_sheets(self, excel_path, out_dir, sheet_names):
+        """Export each requested sheet to its own PDF; returns {sheet_name: pdf_path}.
+        
+        Only the selected sheet is laid out, so a sheet's first page is always
+        page 1 of its PDF no matter how many pages the sheets before it take.
+        """
+        import uno
+
+        def props(**kwargs):
+            values = []
+            for name, value in kwargs.items():
+                prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+                prop.Name = name
+                prop.Value = value
+                values.append(prop)
+            return tuple(values)
+
+        self.job_started = time.monotonic()
+        doc = None
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(os.path.abspath(excel_path)), "_blank", 0,
+                props(Hidden=True, ReadOnly=True))
+            if doc is None:
+                raise RuntimeError("Office could not open document")
+            exported = {}
+            for index, sheet_name in enumerate(sheet_names):
+                if not doc.Sheets.hasByName(sheet_name):
+                    continue
+                pdf_path = os.path.join(out_dir, f"sheet-{index}.pdf")
+                filter_data = uno.Any("[]com.sun.star.beans.PropertyValue",
+                                      props(Selection=doc.Sheets.getByName(sheet_name)))
+                args = props(FilterName="calc_pdf_Export", FilterData=filter_data)
+                # FilterData must keep its sequence type, hence uno.invoke instead of a plain call
+                uno.invoke(doc, "storeToURL", (uno.systemPathToFileUrl(pdf_path),
+                                               uno.Any("[]com.sun.star.beans.PropertyValue", args)))
+                exported[sheet_name] = pdf_path
+            self.jobs_done += 1
+            return exported
+        finally:
+            if doc is not None:
+                try:
+                    doc.close(True)
+                except Exception:
+                    pass
+            self.job_started = None
+
+
+class OfficeWorkerPool:
+    """Supervised pool of isolated office workers with a hang watchdog.
+
+    Workers are recycled after OFFICE_WORKER_MAX_JOBS conversions and
+    hard-killed by the watchdog when a job runs past OFFICE_JOB_TIMEOUT;
+    dead workers are restarted on their next use.
+    """
+
+    def __init__(self, profile_root, size=1):
+        self.profile_root = profile_root
+        self.workers = [OfficeWorker(i, profile_root) for i in range(size)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+        self.stop_event = threading.Event()
+        self.ready = threading.Event()
+        self.watchdog_thread = None
+
+    @staticmethod
+    def is_supported():
+        if not shutil.which("soffice"):
+            return False
+        try:
+            import uno  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self):
+        """Start the watchdog and warm up workers in the background"""
+        self.watchdog_thread = threading.Thread(target=self._watchdog, daemon=True)
+        self.watchdog_thread.start()
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        logger.info(f"Office worker pool started ({len(self.workers)} workers)")
+
+    def _warm_up(self):
+        for _ in range(len(self.workers)):
+            worker = self.idle.get()
+            try:
+                if not worker.is_alive():
+                    worker.start()
+            except Exception as e:
+                logger.error(f"Office worker warm-up failed: {e}")
+            finally:
+                self.idle.put(worker)
+        self.ready.set()
+
+    def _watchdog(self):
+        while not self.stop_event.wait(0.2):
+            for worker in self.workers:
+                started = worker.job_started
+                if started is None:
+                    continue
+                if time.monotonic() - started > OFFICE_JOB_TIMEOUT:
+                    logger.error(f"Office worker {worker.worker_id} hung - killing")
+                    worker.kill()
+                elif worker.cancel_event and worker.cancel_event.is_set():
+                    logger.info(f"Office worker {worker.worker_id} job cancelled - killing")
+                    worker.kill()
+
+    def convert_to_pdf(self, excel_path, out_dir, sheet_names, stop_event=None):
+        """Export the given sheets to PDFs in out_dir, returning {sheet_name: pdf_path} or None"""
+        worker = self.idle.get()
+        worker.cancel_event = stop_event
+        try:
+            if worker.is_alive() and worker.jobs_done >= OFFICE_WORKER_MAX_JOBS:
+                logger.info(f"Recycling office worker {worker.worker_id} after {worker.jobs_done} jobs")
+                worker.kill()
+            if not worker.is_alive():
+                try:
+                    worker.start()
+                except Exception as e:
+                    worker.kill()
+                    raise OfficeUnavailable(f"office worker {worker.worker_id} failed to start: {e}") from e
+            return worker.export_sheets(excel_path, out_dir, sheet_names)
+        except OfficeUnavailable:
+            raise
+        except Exception as e:
+            worker.kill()
+            if stop_event and stop_event.is_set():
+                raise ConversionCancelled("office export")
+            logger.error(f"Office worker {worker.worker_id} conversion failed: {e}")
+            return None
+        finally:
+            worker.cancel_event = None
+            self.idle.put(worker)
+
+    def shutdown(self):
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.kill()
+
+class ConversionJob:
+    """A queued workbook conversion; result is {sheet_name: cache_path}.
+
+    Several callers can wait on one job. Its stop_event fires only once every
+    waiter has given up, and a waiter without a stop_event pins it. A batch
+    job brings a whole folder up to date (paths) and can be preempted.
+    """
+
+    def __init__(self, excel_path, extra_sheets, priority, seq, paths=None):
+        self.excel_path = excel_path
+        self.extra_sheets = list(extra_sheets)
+        self.priority = priority
+        self.seq = seq
+        self.batch = paths is not None
+        self.paths = list(paths) if self.batch else [excel_path]
+        self.preempted = False
+        self.waiter_events = []
+        self.pinned = False
+        self.stop_event = threading.Event()
+        self.status = "queued"
+        self.result = {}
+        self.done = threading.Event()
+
+    def add_waiter(self, stop_event):
+        if stop_event is None:
+            self.pinned = True
+        else:
+            self.waiter_events.append(stop_event)
+
+    def is_abandoned(self):
+        if self.stop_event.is_set():
+            return True
+        return not self.pinned and all(event.is_set() for event in self.waiter_events)
+
+    def finish(self, status, result=None):
+        self.status = status
+        self.result = result or {}
+        self.done.set()
+
+
+class ConversionScheduler:
+    """Priority queue of workbook conversions served by dispatcher threads.
+
+    Lower priority values run first; jobs of equal priority run in
+    submission order. A job is cancelled once all of its waiters gave up;
+    a watchdog also stops running jobs nobody is waiting on any more.
+    Requests for a workbook that is already queued or converting join the
+    existing job instead of converting it twice.
+
+    Folder batches (batch_func) are registered for each of their workbooks.
+    An on-screen request takes its workbook out of a queued batch, and
+    preempts a running batch that holds the workbook or the last free worker;
+    the batch's submitter requeues what is left of it.
+    """
+
+    def __init__(self, convert_func, workers=1, batch_func=None):
+        self.convert_func = convert_func
+        self.batch_func = batch_func
+        self.workers = workers
+        self.heap = []
+        self.seq = 0
+        self.inflight = {}
+        self.running = set()
+        self.cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._dispatch_loop, args=(i,), name=f"conversion-{i}",
+                                      daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        threading.Thread(target=self._abandon_loop, name="conversion-watchdog", daemon=True).start()
+
+    def submit(self, excel_path, extra_sheets=(), priority=PRIORITY_BACKGROUND, stop_event=None):
+        """Queue a conversion, or join the in-flight job for the same workbook.
+
+        A new on-screen request demotes older queued on-screen requests.
+        """
+        with self.cond:
+            if priority == PRIORITY_VISIBLE:
+                for _, seq, queued in list(self.heap):
+                    if (queued.status == "queued" and queued.priority == PRIORITY_VISIBLE
+                            and queued.excel_path != excel_path):
+                        queued.priority = PRIORITY_MODEL
+                        heapq.heappush(self.heap, (PRIORITY_MODEL, seq, queued))
+
+            job = self.inflight.get(excel_path)
+            if job is not None and job.batch and priority == PRIORITY_VISIBLE:
+                if job.status == "queued":
+                    job.paths.remove(excel_path)
+                    del self.inflight[excel_path]
+                else:
+                    self._preempt(job, excel_path)
+                job = None
+            if job is not None and not job.stop_event.is_set():
+                job.add_waiter(stop_event)
+                if job.status == "queued":
+                    job.extra_sheets.extend(name for name in extra_sheets if name not in job.extra_sheets)
+                    if priority < job.priority:
+                        job.priority = priority
+                        heapq.heappush(self.heap, (priority, job.seq, job))
+                        self.cond.notify()
+                logger.debug(f"Joined {job.status} conversion of {os.path.basename(excel_path)}")
+                return job
+
+            self.seq += 1
+            job = ConversionJob(excel_path, extra_sheets, priority, self.seq)
+            job.add_waiter(stop_event)
+            self.inflight[excel_path] = job
+            heapq.heappush(self.heap, (priority, job.seq, job))
+            if priority == PRIORITY_VISIBLE and len(self.running) >= self.workers:
+                # Every worker is busy - a folder batch must not keep the on-screen job waiting
+                batches = [running for running in self.running if running.batch and not running.preempted]
+                if batches:
+                    self._preempt(batches[0], excel_path)
+            self.cond.notify()
+        logger.debug(f"Queued {os.path.basename(excel_path)} at priority {priority}")
+        return job
+
+    def submit_batch(self, paths, priority=PRIORITY_BACKGROUND, stop_event=None):
+        """Queue one batch job for the given workbooks, leaving out those queued or converting already"""
+        with self.cond:
+            paths = [path for path in paths if path not in self.inflight]
+            self.seq += 1
+            job = ConversionJob(paths[0] if paths else "", (), priority, self.seq, paths)
+            job.add_waiter(stop_event)
+            if not paths:
+                job.finish("done")
+                return job
+            for path in paths:
+                self.inflight[path] = job
+            heapq.heappush(self.heap, (priority, job.seq, job))
+            self.cond.notify()
+        logger.debug(f"Queued batch of {len(paths)} files at priority {priority}")
+        return job
+
+    def _preempt(self, job, excel_path):
+        """Stop a running batch for an on-screen request (caller holds the lock)"""
+        logger.info(f"[PREEMPT] batch of {len(job.paths)} files for {os.path.basename(excel_path)}")
+        job.preempted = True
+        job.stop_event.set()
+        for path in job.paths:
+            if self.inflight.get(path) is job:
+                del self.inflight[path]
+
+    def _cancel(self, job):
+        """Cancel a job for all of its waiters; a running job is killed"""
+        with self.cond:
+            if job.done.is_set():
+                return False
+            job.stop_event.set()
+            if job.status == "queued":
+                self._finish(job, "cancelled")
+        return True
+
+    def wait(self, job, stop_event=None):
+        """Block until a job finishes or the caller's stop_event fires.
+
+        The job itself is only cancelled once all of its waiters gave up.
+        """
+        while not job.done.wait(0.25):
+            if job.is_abandoned():
+                self._cancel(job)
+            if stop_event and stop_event.is_set():
+                return {}
+        return job.result
+
+    def idle_workers(self):
+        """Dispatchers not running a job right now"""
+        with self.cond:
+            return self.workers - len(self.running)
+
+    def _finish(self, job, status, result=None):
+        with self.cond:
+            job.finish(status, result)
+            self.running.discard(job)
+            for path in job.paths:
+                if self.inflight.get(path) is job:
+                    del self.inflight[path]
+
+    def _next_job(self):
+        with self.cond:
+            while not self.stop_event.is_set():
+                while self.heap:
+                    priority, _, job = heapq.heappop(self.heap)
+                    if job.status != "queued" or job.priority != priority:
+                        continue
+                    if job.is_abandoned():
+                        self._finish(job, "cancelled")
+                        continue
+                    if job.batch and not job.paths:
+                        # Every workbook was taken out by on-screen requests
+                        self._finish(job, "done")
+                        continue
+                    job.status = "running"
+                    self.running.add(job)
+                    return job
+                self.cond.wait(1.0)
+        return None
+
+    def _abandon_loop(self):
+        """Kill running jobs whose waiters all gave up, not just the one a waiter polls"""
+        while not self.stop_event.wait(0.25):
+            with self.cond:
+                abandoned = [job for job in self.running if not job.stop_event.is_set() and job.is_abandoned()]
+            for job in abandoned:
+                logger.debug(f"Stopping abandoned conversion of {os.path.basename(job.excel_path)}")
+                job.stop_event.set()
+
+    def _dispatch_loop(self, index):
+        while True:
+            # Extra dispatchers only take work while the memory budget allows it
+            while index > 0 and not self.stop_event.is_set():
+                free_mb = available_memory_mb()
+                if free_mb is None or free_mb >= CONVERSION_MIN_FREE_MB:
+                    break
+                self.stop_event.wait(1.0)
+            job = self._next_job()
+            if job is None:
+                return
+            name = f"batch of {len(job.paths)} files" if job.batch else os.path.basename(job.excel_path)
+            try:
+                if job.batch:
+                    self.batch_func(job.paths, job.stop_event)
+                    result = None
+                else:
+                    result = self.convert_func(job.excel_path, job.extra_sheets, job.stop_event, job.priority)
+                self._finish(job, "done", result)
+            except ConversionCancelled as e:
+                logger.info(f"[CANCELLED] {name} ({e})")
+                self._finish(job, "cancelled")
+            except Exception as e:
+                logger.error(f"Conversion job failed for {name}: {e}")
+                self._finish(job, "failed")
+
+    def shutdown(self):
+        self.stop_event.set()
+        with self.cond:
+            for _, _, job in self.heap:
+                if job.status == "queued":
+                    job.stop_event.set()
+                    self._finish(job, "cancelled")
+            self.heap.clear()
+            self.cond.notify_all()
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class ShareUnavailable(OSError):
+    """A share call timed out or was rejected by the open circuit breaker"""
+
+
+class ShareIO:
+    """Bounded executor for network share I/O.
+    
+    Calls run on a fixed pool of daemon threads. A call may wait in the queue
+    for up to the deadline of its operation type and then run for up to that
+    deadline again, so a hung CIFS server costs a timeout instead of a wedged
+    thread. Only calls that ran out of time while running count toward the
+    circuit breaker - a busy share that is slow to get to a call is healthy.
+    Calls that timed out keep their worker until the kernel gives up; once
+    every worker is stuck, or after repeated timeouts, new calls fail fast.
+    After the cooldown a single trial call decides whether the circuit
+    closes. Latencies are kept as a histogram per operation type.
+    """
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, workers=SHARE_IO_WORKERS):
+        self.workers = workers
+        self.tasks = queue.Queue()
+        # Daemon threads: a worker stuck in the kernel must not block interpreter exit
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"share-io-{i}", daemon=True).start()
+        self.lock = threading.Lock()
+        self.stuck = 0
+        self.consecutive_timeouts = 0
+        self.open_until = 0.0
+        self.trial_running = False
+        self.rejected = 0
+        self.histograms = {}
+
+    def run(self, op, func, *args):
+        """func(*args) on the pool within the op's deadline; raises ShareUnavailable otherwise"""
+        with self.lock:
+            trial = self.consecutive_timeouts >= SHARE_IO_BREAKER_THRESHOLD
+            if (trial and (time.monotonic() < self.open_until or self.trial_running)) or self.stuck >= self.workers:
+                self.rejected += 1
+                raise ShareUnavailable(f"share I/O unavailable ({op} rejected)")
+            if trial:
+                self.trial_running = True
+        try:
+            return self._run(op, func, args)
+        finally:
+            if trial:
+                with self.lock:
+                    self.trial_running = False
+
+    def _run(self, op, func, args):
+        deadline = SHARE_IO_DEADLINES.get(op, 10)
+        state = {"finished": False, "abandoned": False}
+        started = threading.Event()
+
+        def call():
+            state["started"] = time.monotonic()
+            started.set()
+            try:
+                return func(*args)
+            finally:
+                with self.lock:
+                    state["finished"] = True
+                    if state["abandoned"]:
+                        self.stuck -= 1
+
+        future = Future()
+        self.tasks.put((future, call))
+        if not started.wait(deadline):
+            with self.lock:
+                if future.cancel():
+                    # Never reached the share - not a sign of a hung server
+                    self._histogram(op)["queue_timeouts"] += 1
+                    raise ShareUnavailable(f"{op} still queued after {deadline}s")
+            # Picked up just now
+            started.wait()
+        try:
+            result = future.result(max(0.0, state["started"] + deadline - time.monotonic()))
+        except FutureTimeout:
+            with self.lock:
+                # Its worker is stuck until the call returns
+                if not state["finished"]:
+                    state["abandoned"] = True
+                    self.stuck += 1
+            self._record(op, None)
+            raise ShareUnavailable(f"{op} exceeded {deadline}s deadline")
+        except Exception:
+            # The share answered (with an error) - that still counts as responsive
+            self._record(op, time.monotonic() - state["started"])
+            raise
+        self._record(op, time.monotonic() - state["started"])
+        return result
+
+    def _worker(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            future, call = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(call())
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _histogram(self, op):
+        return self.histograms.setdefault(op, {"counts": [0] * (len(self.BUCKETS_MS) + 1), "calls": 0,
+                                               "timeouts": 0, "queue_timeouts": 0, "max_ms": 0.0})
+
+    def _record(self, op, latency):
+        with self.lock:
+            hist = self._histogram(op)
+            hist["calls"] += 1
+            if latency is None:
+                hist["timeouts"] += 1
+                self.consecutive_timeouts += 1
+                if self.consecutive_timeouts == SHARE_IO_BREAKER_THRESHOLD:
+                    self.open_until = time.monotonic() + SHARE_IO_BREAKER_COOLDOWN
+                    logger.warning(f"Share I/O circuit open for {SHARE_IO_BREAKER_COOLDOWN}s after "
+                                   f"{self.consecutive_timeouts} timeouts ({op})")
+                elif self.consecutive_timeouts > SHARE_IO_BREAKER_THRESHOLD:
+                    # The trial call after the cooldown failed too
+                    self.open_until = time.monotonic() + SHARE_IO_BREAKER_COOLDOWN
+                return
+            ms = latency * 1000
+            hist["counts"][sum(1 for bound in self.BUCKETS_MS if ms > bound)] += 1
+            hist["max_ms"] = max(hist["max_ms"], ms)
+            if self.consecutive_timeouts >= SHARE_IO_BREAKER_THRESHOLD:
+                logger.info("Share I/O circuit closed")
+            self.consecutive_timeouts = 0
+
+    def reset(self):
+        """Close the circuit (the share monitor saw the share answer again)"""
+        with self.lock:
+            if self.consecutive_timeouts >= SHARE_IO_BREAKER_THRESHOLD:
+                logger.info("Share I/O circuit closed")
+            self.consecutive_timeouts = 0
+            self.open_until = 0.0
+
+    def percentile(self, counts, fraction):
+        """Upper bucket bound (ms) below which the given fraction of completed calls fall"""
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS + (float("inf"),), counts):
+            seen += count
+            if seen >= fraction * total:
+                return bound
+        return float("inf")
+
+    def stats(self):
+        with self.lock:
+            stats = {"rejected": self.rejected, "stuck": self.stuck,
+                     "circuit": "open" if time.monotonic() < self.open_until else "closed"}
+            for op, hist in sorted(self.histograms.items()):
+                stats[op] = {"calls": hist["calls"], "timeouts": hist["timeouts"],
+                             "queue_timeouts": hist["queue_timeouts"],
+                             "p50_ms": self.percentile(hist["counts"], 0.5),
+                             "p95_ms": self.percentile(hist["counts"], 0.95),
+                             "max_ms": round(hist["max_ms"], 1)}
+        return stats
+
+    def shutdown(self):
+        for _ in range(self.workers):
+            self.tasks.put(None)
+
+
+class ShareMonitor:
+    """Tracks the network share as "online", "degraded" or "offline".
+    
+    The kernel flags /proc/self/mountinfo with POLLPRI whenever the mount table
+    changes, so mounts and unmounts are seen at once; a periodic probe catches
+    a server that hangs or dies behind a mount that is still present. Probes
+    run on their own thread with a deadline - a probe stuck in the kernel just
+    counts as offline and no second one is started until it returns.
+    """
+
+    ONLINE = "online"
+    DEGRADED = "degraded"
+    OFFLINE = "offline"
+
+    def __init__(self, base_path, on_change):
+        self.base_path = base_path
+        self.on_change = on_change
+        self.state = None
+        self.latencies = []
+        self.last_error = None
+        self.probe_thread = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def mount_of(self, mountinfo):
+        """(mount point, fs type, source) of the mount holding the share path"""
+        best = ("/", "", "")
+        for line in mountinfo.splitlines():
+            fields, _, tail = line.partition(" - ")
+            fields, tail = fields.split(), tail.split()
+            if len(fields) < 5 or len(tail) < 2:
+                continue
+            # Mount points escape spaces and other special characters as octal
+            mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[4])
+            prefix = mount_point.rstrip("/") + "/"
+            if (self.base_path + "/").startswith(prefix) and len(mount_point) >= len(best[0]):
+                best = (mount_point, tail[0], tail[1])
+        return best
+
+    def probe(self):
+        """Latency in seconds of a stat + listing of the share root, or None on error/timeout"""
+        if self.probe_thread and self.probe_thread.is_alive():
+            self.last_error = "previous probe still blocked"
+            return None
+        result = {}
+
+        def run():
+            started = time.monotonic()
+            try:
+                os.stat(self.base_path)
+                with os.scandir(self.base_path) as it:
+                    next(it, None)
+                result["latency"] = time.monotonic() - started
+            except OSError as e:
+                result["error"] = e
+
+        self.probe_thread = threading.Thread(target=run, daemon=True)
+        self.probe_thread.start()
+        self.probe_thread.join(SHARE_PROBE_TIMEOUT)
+        if self.probe_thread.is_alive():
+            self.last_error = f"no answer within {SHARE_PROBE_TIMEOUT}s"
+            return None
+        self.last_error = result.get("error")
+        return result.get("latency")
+
+    def check(self):
+        latency = self.probe()
+        if latency is None:
+            self.latencies.clear()
+            state = self.OFFLINE
+        else:
+            self.latencies = (self.latencies + [latency])[-SHARE_LATENCY_WINDOW:]
+            slow = statistics.median(self.latencies) >= SHARE_DEGRADED_LATENCY
+            state = self.DEGRADED if slow else self.ONLINE
+            logger.debug(f"Share probe: {latency * 1000:.0f} ms")
+
+        if state != self.state:
+            previous, self.state = self.state, state
+            if state == self.OFFLINE:
+                logger.warning(f"Share {state}: {self.last_error}")
+            else:
+                logger.info(f"Share {state} (median probe {statistics.median(self.latencies) * 1000:.0f} ms)")
+            try:
+                self.on_change(state, previous)
+            except Exception as e:
+                logger.error(f"Share state handler failed: {e}")
+
+    def _run(self):
+        try:
+            mountinfo = open(MOUNTINFO_PATH, "r")
+        except OSError as e:
+            logger.warning(f"Mount table not watchable ({e}) - probing every {SHARE_PROBE_INTERVAL}s only")
+            mountinfo = None
+        poller = select.poll()
+        if mountinfo:
+            poller.register(mountinfo, select.POLLPRI | select.POLLERR)
+
+        mount = None
+        try:
+            while not self.stop_event.is_set():
+                if mountinfo:
+                    # Re-reading from the start also re-arms the change notification
+                    mountinfo.seek(0)
+                    current = self.mount_of(mountinfo.read())
+                    if current != mount:
+                        mount_point, fs_type, source = current
+                        logger.info(f"Share path is on {mount_point} ({fs_type or 'unknown'} from {source or '-'})")
+                        mount = current
+                self.check()
+                # Short slices so stop() is honoured promptly
+                deadline = time.monotonic() + SHARE_PROBE_INTERVAL
+                while not self.stop_event.is_set() and time.monotonic() < deadline:
+                    if poller.poll(max(0.0, min(1.0, deadline - time.monotonic())) * 1000):
+                        logger.debug("Mount table changed")
+                        break
+        finally:
+            if mountinfo:
+                mountinfo.close()
+
+class ShareCatalog:
+    """In-memory tree of the network share: department -> model -> files.
+    
+    Folders are listed with os.scandir (entry types come with the listing, no
+    per-entry stat) and only re-listed when their mtime changes. A folder
+    checked within SHARE_CATALOG_REVALIDATE seconds is served from memory
+    without touching the share at all. Files are indexed by display name.
+
+    The tree is persisted to a JSON snapshot. While offline, listings are
+    served from it as-is so the UI is browsable before the share mounts;
+    going online revalidates every folder against its mtime on next use.
+    """
+
+    FLUSH_INTERVAL = 30
+
+    def __init__(self, base_path, snapshot_file=None, share_io=None):
+        self.base_path = base_path
+        self.snapshot_file = snapshot_file
+        self.share_io = share_io or ShareIO()
+        self.lock = threading.Lock()
+        self.folders = {}
+        self.offline = False
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        if snapshot_file:
+            self.load_snapshot()
+
+    def load_snapshot(self):
+        try:
+            with open(self.snapshot_file, "r") as f:
+                folders = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Share snapshot unreadable, starting empty: {e}")
+            return
+        with self.lock:
+            for path, entry in folders.items():
+                # Never checked this session - revalidated on first use once online
+                entry["checked"] = float("-inf")
+                self.folders[path] = entry
+        logger.info(f"Share snapshot loaded: {len(folders)} folders")
+
+    def flush(self, force=False):
+        """Persist the snapshot, at most every FLUSH_INTERVAL seconds unless forced"""
+        if not self.snapshot_file:
+            return
+        with self.lock:
+            if not self.dirty or (not force and time.monotonic() - self.last_flush < self.FLUSH_INTERVAL):
+                return
+            snapshot = json.dumps({path: {key: entry[key] for key in ("mtime", "subdirs", "files")}
+                                   for path, entry in self.folders.items()})
+            self.dirty = False
+            self.last_flush = time.monotonic()
+        try:
+            temp_path = f"{self.snapshot_file}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(snapshot)
+            durable_replace(temp_path, self.snapshot_file)
+        except Exception as e:
+            logger.error(f"Error saving share snapshot: {e}")
+
+    def set_offline(self, offline):
+        """Serve listings from the snapshot only (True) or revalidate against the share (False)"""
+        with self.lock:
+            if self.offline == offline:
+                return
+            self.offline = offline
+            if not offline:
+                for entry in self.folders.values():
+                    entry["checked"] = float("-inf")
+        logger.info(f"Share catalog {'offline - serving snapshot' if offline else 'online - reconciling'}")
+
+    def dept_path(self, dept):
+        return os.path.join(self.base_path, SPECIAL_DEPT_PATHS.get(dept, dept))
+
+    def _listing(self, path):
+        with self.lock:
+            entry = self.folders.get(path)
+        if self.offline:
+            if entry is None:
+                raise FileNotFoundError(f"{path} not in share snapshot")
+            return entry
+        if entry and time.monotonic() - entry["checked"] < SHARE_CATALOG_REVALIDATE:
+            return entry
+
+        mtime = self.share_io.run("stat", os.stat, path).st_mtime_ns
+        if entry and entry["mtime"] == mtime:
+            entry["checked"] = time.monotonic()
+            return entry
+
+        subdirs, files = self.share_io.run("list", self.scan, path)
+        index = {}
+        for name in sorted(files):
+            # Same display name twice (e.g. .xlsx and .png) - the first in sort order wins, as before
+            index.setdefault(os.path.splitext(name)[0], files[name])
+        entry = {"mtime": mtime, "checked": time.monotonic(), "subdirs": sorted(subdirs), "files": index}
+        with self.lock:
+            self.folders[path] = entry
+            self.dirty = True
+        self.flush()
+        logger.debug(f"Catalog refreshed: {path} ({len(subdirs)} folders, {len(index)} files)")
+        return entry
+
+    @staticmethod
+    def scan(path):
+        """(subfolder names, {file name: path} of supported files) of one folder"""
+        subdirs, files = [], {}
+        with os.scandir(path) as it:
+            for item in it:
+                if item.is_dir():
+                    subdirs.append(item.name)
+                elif item.name.lower().endswith(SUPPORTED_FORMATS) and item.is_file():
+                    files[item.name] = item.path
+        return subdirs, files
+
+    def models(self, dept):
+        """Sorted model folder names of a department (raises OSError when unreachable)"""
+        excluded = EXCLUDED_MODEL_FOLDERS.get(dept, [])
+        return [m for m in self._listing(self.dept_path(dept))["subdirs"] if m not in excluded]
+
+    def files(self, folder):
+        """{display name: path} of supported files in a folder, sorted by name"""
+        return self._listing(folder)["files"]
+
+class SheetCatalog:
+    """Sheet names per workbook, read from xl/workbook.xml only.
+
+    Entries are keyed by path and validated against size + mtime, kept in
+    memory and persisted to a small JSON file so restarts stay cheap.
+    """
+
+    FLUSH_INTERVAL = 30
+
+    def __init__(self, cache_file, share_io=None):
+        self.cache_file = cache_file
+        self.share_io = share_io or ShareIO()
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        try:
+            with open(cache_file, "r") as f:
+                self.entries = json.load(f)
+            logger.info(f"Sheet catalog loaded: {len(self.entries)} workbooks")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Sheet catalog unreadable, starting empty: {e}")
+
+    @staticmethod
+    def read_sheet_names(excel_path):
+        """Parse sheet names from the workbook part without loading the workbook"""
+        with zipfile.ZipFile(excel_path) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        return [sheet.get("name") for sheet in root.iter(f"{{{XLSX_MAIN_NS}}}sheet")]
+
+    def cached_sheet_names(self, excel_path):
+        """Last known sheet names without touching the source (may be outdated)"""
+        with self.lock:
+            entry = self.entries.get(excel_path)
+        return entry["sheets"] if entry else None
+
+    def get_sheet_names(self, excel_path):
+        st = self.share_io.run("stat", os.stat, excel_path)
+        with self.lock:
+            entry = self.entries.get(excel_path)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+            return entry["sheets"]
+
+        try:
+            sheet_names = self.share_io.run("read", self.read_sheet_names, excel_path)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            logger.debug(f"Fast sheet read failed for {os.path.basename(excel_path)} ({e}), using openpyxl")
+            from openpyxl import load_workbook
+            wb = load_workbook(io.BytesIO(self.share_io.run("workbook", read_file, excel_path)), read_only=True)
+            sheet_names = wb.sheetnames
+            wb.close()
+
+        with self.lock:
+            self.entries[excel_path] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sheets": sheet_names}
+            self.dirty = True
+        self.flush()
+        return sheet_names
+
+    def flush(self, force=False):
+        """Persist the catalog, at most every FLUSH_INTERVAL seconds unless forced"""
+        with self.lock:
+            if not self.dirty or (not force and time.monotonic() - self.last_flush < self.FLUSH_INTERVAL):
+                return
+            snapshot = json.dumps(self.entries)
+            self.dirty = False
+            self.last_flush = time.monotonic()
+        try:
+            temp_path = f"{self.cache_file}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(snapshot)
+            durable_replace(temp_path, self.cache_file)
+        except Exception as e:
+            logger.error(f"Error saving sheet catalog: {e}")
+
+class RenderIndex:
+    """SQLite index of cached renders.
+
+    Maps (source path, sheet, render profile) to the cached artifact together
+    with the source fingerprint it was rendered from, its size, render time
+    and access statistics. Artifact paths are stored relative to the cache dir.
+    Artifacts are content-addressed, so several sources can share one. The
+    sources table remembers each file's content fingerprint per size + mtime
+    so it is only recomputed after a change. The failures table holds
+    missing sheet types and failed renders per fingerprint.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS renders (
+            source_path TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            artifact TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_access REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            render_ms INTEGER,
+            sheet_key TEXT,
+            PRIMARY KEY (source_path, sheet, profile)
+        );
+        CREATE INDEX IF NOT EXISTS renders_artifact ON renders (artifact);
+        CREATE INDEX IF NOT EXISTS renders_fingerprint ON renders (fingerprint, sheet, profile);
+        CREATE TABLE IF NOT EXISTS failures (
+            fingerprint TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            source_path TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            last_error TEXT,
+            retry_after REAL,
+            PRIMARY KEY (fingerprint, sheet)
+        );
+        CREATE TABLE IF NOT EXISTS sources (
+            source_path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(renders)")}
+        if "sheet_key" not in columns:
+            self.db.execute("ALTER TABLE renders ADD COLUMN sheet_key TEXT")
+
+    def lookup(self, source_path, sheet, profile, touch=False):
+        """Return (artifact, fingerprint, created, sheet_key) or None.
+        
+        touch counts the lookup as an access; only pages actually shown do,
+        so precache passes do not skew eviction and warm start rankings.
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT artifact, fingerprint, created, sheet_key FROM renders "
+                "WHERE source_path = ? AND sheet = ? AND profile = ?",
+                (source_path, sheet, profile)).fetchone()
+            if row and touch:
+                self.db.execute(
+                    "UPDATE renders SET last_access = ?, hits = hits + 1 "
+                    "WHERE source_path = ? AND sheet = ? AND profile = ?",
+                    (time.time(), source_path, sheet, profile))
+        return row
+
+    def find_by_fingerprint(self, fingerprint, sheet, profile):
+        """Return (artifact, created, source_path) of any render of this content, or None"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT artifact, created, source_path FROM renders "
+                "WHERE fingerprint = ? AND sheet = ? AND profile = ? ORDER BY created DESC LIMIT 1",
+                (fingerprint, sheet, profile)).fetchone()
+
+    def artifact_of(self, source_path, sheet, profile):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT artifact FROM renders WHERE source_path = ? AND sheet = ? AND profile = ?",
+                (source_path, sheet, profile)).fetchone()
+        return row[0] if row else None
+
+    def record(self, source_path, sheet, profile, fingerprint, artifact, size, render_ms=None, created=None,
+               sheet_key=None):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO renders (source_path, sheet, profile, fingerprint, artifact, "
+                "size, created, last_access, hits, render_ms, sheet_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (source_path, sheet, profile, fingerprint, artifact, size, created or now, now, render_ms,
+                 sheet_key))
+
+    def rebind(self, source_path, sheet, profile, fingerprint):
+        """Carry a render over to a new workbook fingerprint (the sheet itself is unchanged)"""
+        with self.lock:
+            self.db.execute("UPDATE renders SET fingerprint = ? WHERE source_path = ? AND sheet = ? AND profile = ?",
+                            (fingerprint, source_path, sheet, profile))
+
+    def source_fingerprint(self, source_path, size, mtime_ns):
+        """Content fingerprint recorded for this exact size + mtime, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT fingerprint FROM sources WHERE source_path = ? AND size = ? AND mtime_ns = ?",
+                (source_path, size, mtime_ns)).fetchone()
+        return row[0] if row else None
+
+    def failure(self, fingerprint, sheet):
+        """Return (kind, attempts, retry_after, last_error) or None"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT kind, attempts, retry_after, last_error FROM failures WHERE fingerprint = ? AND sheet = ?",
+                (fingerprint, sheet)).fetchone()
+
+    def record_failure(self, fingerprint, sheet, kind, source_path, error=None, backoff=None):
+        """Count a failure; backoff(attempts) gives seconds until retry (None: until content changes)"""
+        with self.lock:
+            row = self.db.execute("SELECT attempts FROM failures WHERE fingerprint = ? AND sheet = ?",
+                                  (fingerprint, sheet)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry_after = time.time() + backoff(attempts) if backoff else None
+            self.db.execute(
+                "INSERT OR REPLACE INTO failures (fingerprint, sheet, kind, source_path, attempts, last_error, "
+                "retry_after) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fingerprint, sheet, kind, source_path, attempts, error, retry_after))
+        return attempts, retry_after
+
+    def clear_failure(self, fingerprint, sheet):
+        with self.lock:
+            self.db.execute("DELETE FROM failures WHERE fingerprint = ? AND sheet = ?", (fingerprint, sheet))
+
+    def failure_stats(self):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(retry_after > ?), 0) FROM failures GROUP BY kind",
+                (time.time(),)).fetchall()
+        stats = {"missing_sheets": 0, "failed": 0, "backing_off": 0}
+        for kind, count, backing_off in rows:
+            stats["missing_sheets" if kind == "missing" else "failed"] += count
+            stats["backing_off"] += backing_off
+        return stats
+
+    def forget_source(self, source_path):
+        with self.lock:
+            self.db.execute("DELETE FROM sources WHERE source_path = ?", (source_path,))
+
+    def record_source(self, source_path, size, mtime_ns, fingerprint):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO sources (source_path, size, mtime_ns, fingerprint) "
+                            "VALUES (?, ?, ?, ?)", (source_path, size, mtime_ns, fingerprint))
+
+    def remove(self, source_path, sheet, profile):
+        with self.lock:
+            self.db.execute("DELETE FROM renders WHERE source_path = ? AND sheet = ? AND profile = ?",
+                            (source_path, sheet, profile))
+
+    def most_used(self, profile, limit=-1):
+        """Most frequently (then most recently) shown renders (limit -1: all of them)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT source_path, sheet, artifact, created FROM renders WHERE profile = ? "
+                "ORDER BY hits DESC, last_access DESC LIMIT ?", (profile, limit)).fetchall()
+
+    def total_bytes(self):
+        """Bytes on disk; a shared artifact is counted once"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT artifact, size FROM renders)").fetchone()[0]
+
+    def eviction_candidates(self, hit_bonus):
+        """All entries, least valuable first (recency plus a bonus per hit)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT source_path, sheet, profile, artifact, size FROM renders "
+                "ORDER BY last_access + hits * ? ASC", (hit_bonus,)).fetchall()
+
+    def entries(self):
+        with self.lock:
+            return self.db.execute("SELECT source_path, sheet, profile, artifact FROM renders").fetchall()
+
+    def artifacts(self):
+        with self.lock:
+            return {row[0] for row in self.db.execute("SELECT DISTINCT artifact FROM renders")}
+
+    def artifact_refs(self, artifact):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM renders WHERE artifact = ?", (artifact,)).fetchone()[0]
+
+    def stats(self):
+        with self.lock:
+            count, artifacts, avg_ms = self.db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT artifact), AVG(render_ms) FROM renders").fetchone()
+            total_bytes = self.db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT artifact, size FROM renders)").fetchone()[0]
+        return {"entries": count, "artifacts": artifacts, "bytes": total_bytes, "avg_render_ms": avg_ms}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class DiskCacheManager:
+    """Keeps the render cache inside a byte quota.
+
+    Eviction is access-aware: an entry's retention score is its last access
+    time plus DISK_CACHE_HIT_BONUS seconds per hit, lowest score goes first.
+    Renders of the pinned (current) department are never evicted. A periodic
+    sweep drops renders whose source workbook disappeared and files in the
+    cache dir that the index doesn't know about.
+    """
+
+    def __init__(self, cache_dir, render_index, quota_mb=DISK_CACHE_QUOTA_MB, share_io=None):
+        self.cache_dir = cache_dir
+        self.render_index = render_index
+        self.share_io = share_io or ShareIO()
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.pinned_prefixes = []
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.orphans_removed = 0
+        self.stop_event = threading.Event()
+
+    def effective_quota(self, used_bytes):
+        """Quota, shrunk further if the card itself is running out of space"""
+        try:
+            st = os.statvfs(self.cache_dir)
+            free_bytes = st.f_bavail * st.f_frsize
+        except OSError:
+            return self.quota_bytes
+        headroom = used_bytes + free_bytes - DISK_CACHE_MIN_FREE_MB * 1024 * 1024
+        return max(0, min(self.quota_bytes, headroom))
+
+    def pin(self, paths):
+        """Protect renders whose source lives under any of these folders"""
+        with self.lock:
+            self.pinned_prefixes = [os.path.join(path, "") for path in paths if path]
+        logger.info(f"Disk cache pinned: {', '.join(paths) or 'nothing'}")
+
+    def delete_entry(self, source_path, sheet, profile, artifact):
+        self.render_index.remove(source_path, sheet, profile)
+        return self.release_artifact(artifact)
+
+    def release_artifact(self, artifact):
+        """Delete an artifact file once no index entry refers to it any more"""
+        if self.render_index.artifact_refs(artifact) > 0:
+            return False
+        try:
+            os.remove(os.path.join(self.cache_dir, artifact))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def enforce_quota(self):
+        """Evict the least valuable unpinned renders until usage fits the quota"""
+        with self.lock:
+            pinned = list(self.pinned_prefixes)
+            used = self.render_index.total_bytes()
+            quota = self.effective_quota(used)
+            if used <= quota:
+                return 0
+            freed = 0
+            for source_path, sheet, profile, artifact, size in self.render_index.eviction_candidates(
+                    DISK_CACHE_HIT_BONUS):
+                if used - freed <= quota:
+                    break
+                if any(source_path.startswith(prefix) for prefix in pinned):
+                    continue
+                # Shared renders only free space once their last reference goes
+                if self.delete_entry(source_path, sheet, profile, artifact):
+                    freed += size
+                    self.evictions += 1
+            self.evicted_bytes += freed
+        logger.info(f"Disk cache over quota: evicted {freed / 1048576:.1f} MB "
+                    f"({used / 1048576:.1f} MB used, quota {quota / 1048576:.1f} MB)")
+        return freed
+
+    def sweep_orphans(self):
+        """Drop renders of deleted/renamed workbooks and unindexed files"""
+        if not self.share_io.run("stat", os.path.isdir, NETWORK_BASE_PATH):
+            logger.debug("Orphan sweep skipped - network drive not available")
+            return 0
+        removed = 0
+        for source_path, sheet, profile, artifact in self.render_index.entries():
+            if self.stop_event.is_set():
+                return removed
+            # Only trust a missing file when its department folder is still reachable
+            exists = self.share_io.run("stat", os.path.exists, source_path)
+            if not exists and self.share_io.run("stat", os.path.isdir, os.path.dirname(os.path.dirname(source_path))):
+                self.delete_entry(source_path, sheet, profile, artifact)
+                self.render_index.forget_source(source_path)
+                removed += 1
+
+        known = self.render_index.artifacts()
+        for entry in os.scandir(self.cache_dir):
+            # Skip fresh files: a render is moved in just before it is indexed
+            if (entry.is_file() and entry.name.endswith(CACHE_ARTIFACT_EXTENSIONS) and entry.name not in known
+                    and entry.stat().st_mtime < time.time() - 600):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        self.orphans_removed += removed
+        if removed:
+            logger.info(f"Orphan sweep removed {removed} cache entries")
+        return removed
+
+    def start(self):
+        threading.Thread(target=self._maintenance_loop, daemon=True).start()
+
+    def _maintenance_loop(self):
+        while not self.stop_event.wait(DISK_CACHE_SWEEP_INTERVAL):
+            try:
+                self.sweep_orphans()
+                self.enforce_quota()
+            except Exception as e:
+                logger.error(f"Disk cache maintenance error: {e}")
+
+    def stats(self):
+        stats = self.render_index.stats()
+        stats.update(self.render_index.failure_stats())
+        stats.update(quota_bytes=self.quota_bytes, evictions=self.evictions,
+                     evicted_bytes=self.evicted_bytes, orphans_removed=self.orphans_removed)
+        return stats
+
+    def stop(self):
+        self.stop_event.set()
+
+class DirectRenderUnsupported(Exception):
+    """Sheet uses a feature the direct renderer cannot draw"""
+
+class DirectSheetRenderer:
+    """Draw simple worksheets straight to a PIL image, without LibreOffice.
+    
+    Covers column widths, row heights, hidden rows/columns, merged cells,
+    solid fills, borders (dash styles drawn solid), fonts, alignment, wrapping
+    and embedded pictures. Anything else raises DirectRenderUnsupported so the
+    caller can fall back to the PDF export.
+    """
+    EMU_PER_PIXEL = 9525
+    BORDER_WIDTHS = {"hair": 1, "thin": 1, "dotted": 1, "dashed": 1, "dashDot": 1, "dashDotDot": 1,
+                     "medium": 2, "mediumDashed": 2, "mediumDashDot": 2, "mediumDashDotDot": 2,
+                     "slantDashDot": 2, "thick": 3, "double": 3}
+    # Excel theme color index -> clrScheme element
+    THEME_COLORS = ["lt1", "dk1", "lt2", "dk2", "accent1", "accent2", "accent3",
+                    "accent4", "accent5", "accent6", "hlink", "folHlink"]
+    # Drawing elements openpyxl drops on load; their presence means we cannot draw the sheet
+    SHAPE_TAGS = re.compile(rb"</\w+:(sp|cxnSp|grpSp|graphicFrame)>")
+    DATE_TOKENS = re.compile(r"yyyy|yy|mmmm|mmm|mm|m|dddd|ddd|dd|d")
+    CELL_PADDING = 2
+    
+    def __init__(self):
+        self.font_paths = {style: next((p for p in paths if os.path.exists(p)), None)
+                           for style, paths in DIRECT_RENDER_FONTS.items()}
+        self._fonts = {}
+        # Column widths assume Calibri 11 digits (7px); shrink wider substitute fonts to match
+        digit = ImageFont.truetype(self.font_paths["regular"], 100).getlength("0") / 100
+        self.font_correction = min(1.0, 7 / (digit * 11 * 96 / 72))
+    
+    @staticmethod
+    def is_supported():
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return False
+        return any(os.path.exists(p) for p in DIRECT_RENDER_FONTS["regular"])
+    
+    def render_sheets(self, excel_path, sheet_names, size, source=None):
+        """Return {sheet_name: image} for every requested sheet that could be drawn.
+        
+        source is an already read copy of the workbook (file object), if any.
+        """
+        from openpyxl import load_workbook
+        
+        source = source or excel_path
+        with zipfile.ZipFile(source) as zf:
+            for name in zf.namelist():
+                if name.startswith("xl/drawings/") and name.endswith(".xml") and self.SHAPE_TAGS.search(zf.read(name)):
+                    # Drawing parts are not mapped back to sheets here, so any shape rules out the workbook
+                    logger.info(f"[DIRECT] {os.path.basename(excel_path)}: shapes or charts - using LibreOffice")
+                    return {}
+        
+        wb = load_workbook(source, data_only=True)
+        try:
+            theme = self.theme_palette(wb)
+            images = {}
+            for sheet_name in sheet_names:
+                try:
+                    images[sheet_name] = self.render_sheet(wb[sheet_name], size, theme)
+                except DirectRenderUnsupported as e:
+                    logger.info(f"[DIRECT] {os.path.basename(excel_path)} - {sheet_name}: {e} - using LibreOffice")
+            return images
+        finally:
+            wb.close()
+    
+    def theme_palette(self, wb):
+        palette = {}
+        if not wb.loaded_theme:
+            return []
+        root = ElementTree.fromstring(wb.loaded_theme)
+        scheme = root.find(f".//{{{DRAWINGML_NS}}}clrScheme")
+        if scheme is None:
+            return []
+        for entry in scheme:
+            tag = entry.tag.split("}")[-1]
+            for color in entry:
+                value = color.get("lastClr") or color.get("val")
+                if value and len(value) == 6:
+                    palette[tag] = value
+        return [palette.get(name, "000000") for name in self.THEME_COLORS]
+    
+    def resolve_color(self, color, theme, default):
+        """Map an openpyxl Color to an (r, g, b) tuple"""
+        if color is None or color.type == "auto":
+            return default
+        if color.type == "rgb" and isinstance(color.rgb, str):
+            value = color.rgb[-6:]
+        elif color.type == "theme" and color.theme < len(theme):
+            value = theme[color.theme]
+        elif color.type == "indexed":
+            from openpyxl.styles.colors import COLOR_INDEX
+            if color.indexed >= len(COLOR_INDEX):
+                return default
+            value = COLOR_INDEX[color.indexed][-6:]
+        else:
+            return default
+        rgb = tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+        if color.tint:
+            # Excel tint: darken (negative) or lighten (positive) in HLS space
+            h, l, s = colorsys.rgb_to_hls(*(c / 255 for c in rgb))
+            l = l * (1 + color.tint) if color.tint < 0 else l * (1 - color.tint) + color.tint
+            rgb = tuple(round(c * 255) for c in colorsys.hls_to_rgb(h, l, s))
+        return rgb
+    
+    def font(self, bold, italic, px):
+        style = ("bold" if bold else "") + ("italic" if italic else "") or "regular"
+        path = self.font_paths.get(style) or self.font_paths["regular"]
+        key = (path, px)
+        if key not in self._fonts:
+            self._fonts[key] = ImageFont.truetype(path, px)
+        return self._fonts[key]
+    
+    def print_bounds(self, ws):
+        """(min_col, min_row, max_col, max_row) of the print area, or the used range"""
+        from openpyxl.utils.cell import range_boundaries
+        
+        area = ws.print_area
+        if area:
+            ranges = area.split(",")
+            if len(ranges) > 1:
+                raise DirectRenderUnsupported("multiple print ranges")
+            return range_boundaries(ranges[0].rsplit("!", 1)[-1].replace("$", ""))
+        return ws.min_column, ws.min_row, ws.max_column, ws.max_row
+    
+    def column_widths(self, ws, last_col):
+        """Pixel width per column 1..last_col (index 0 unused)"""
+        default = ws.sheet_format.defaultColWidth or (ws.sheet_format.baseColWidth or 8) + 0.43
+        widths = [0] + [default] * last_col
+        for dim in ws.column_dimensions.values():
+            for col in range(max(dim.min or 1, 1), min(dim.max or 0, last_col) + 1):
+                widths[col] = 0 if dim.hidden else (dim.width if dim.customWidth or dim.width else default)
+        # Character widths -> pixels (Calibri 11 max digit width is 7px, plus 5px padding)
+        return [int(w * 7 + 5) if w else 0 for w in widths]
+    
+    def row_heights(self, ws, last_row):
+        """Pixel height per row 1..last_row (index 0 unused)"""
+        default = ws.sheet_format.defaultRowHeight or 15
+        heights = [0] * (last_row + 1)
+        for row in range(1, last_row + 1):
+            dim = ws.row_dimensions.get(row)
+            if dim is not None and dim.hidden:
+                continue
+            heights[row] = (dim.ht if dim is not None and dim.ht else default) * 96 / 72
+        return heights
+    
+    def format_value(self, cell):
+        value = cell.value
+        fmt = (cell.number_format or "General").split(";")[0]
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, (datetime, date)):
+            return self.format_date(value, fmt)
+        if isinstance(value, (int, float)):
+            if fmt == "General" or not re.search(r"[0#]", fmt):
+                return str(int(value)) if float(value).is_integer() else f"{value:.10g}"
+            decimals = len(re.search(r"\.([0#]*)", fmt).group(1)) if "." in fmt else 0
+            if fmt.endswith("%"):
+                return f"{value * 100:.{decimals}f}%"
+            return f"{value:,.{decimals}f}" if "," in fmt else f"{value:.{decimals}f}"
+        return str(value)
+    
+    def format_date(self, value, fmt):
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        date_part = re.sub(r'\[[^\]]*\]|"|\\\\', "", fmt.lower().split(" h")[0].split(" ")[0])
+        if not re.search(r"[ymd]", date_part):
+            date_part = "m/d/yyyy"
+        tokens = {"yyyy": f"{value.year}", "yy": f"{value.year % 100:02d}",
+                  "mmmm": value.strftime("%B"), "mmm": value.strftime("%b"),
+                  "mm": f"{value.month:02d}", "m": f"{value.month}",
+                  "dddd": value.strftime("%A"), "ddd": value.strftime("%a"),
+                  "dd": f"{value.day:02d}", "d": f"{value.day}"}
+        text = self.DATE_TOKENS.sub(lambda m: tokens[m.group(0)], date_part)
+        if "h" in fmt.lower():
+            text += f" {value.hour}:{value.minute:02d}"
+        return text
+    
+    def wrap_lines(self, text, font, width):
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for word in paragraph.split(" "):
+                candidate = f"{line} {word}" if line else word
+                if line and font.getlength(candidate) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return lines
+    
+    def check_cell(self, cell):
+        alignment = cell.alignment
+        if alignment.textRotation:
+            raise DirectRenderUnsupported(f"rotated text in {cell.coordinate}")
+        fill = cell.fill
+        if fill is not None and getattr(fill, "fill_type", "gradient") not in (None, "solid"):
+            raise DirectRenderUnsupported(f"{getattr(fill, 'fill_type', 'gradient')} fill in {cell.coordinate}")
+        if cell.border.diagonal is not None and cell.border.diagonal.style:
+            raise DirectRenderUnsupported(f"diagonal border in {cell.coordinate}")
+    
+    def render_sheet(self, ws, size, theme):
+        if ws._charts:
+            raise DirectRenderUnsupported("charts")
+        if len(ws.conditional_formatting):
+            raise DirectRenderUnsupported("conditional formatting")
+        if any(getattr(ws.HeaderFooter, part) for part in ("oddHeader", "oddFooter", "evenHeader", "evenFooter",
+                                                           "firstHeader", "firstFooter")):
+            raise DirectRenderUnsupported("page header or footer")
+        if ws.print_options.gridLines:
+            raise DirectRenderUnsupported("printed gridlines")
+        
+        min_col, min_row, max_col, max_row = self.print_bounds(ws)
+        markers = [marker for img in ws._images
+                   for marker in (getattr(img.anchor, "_from", None), getattr(img.anchor, "to", None)) if marker]
+        last_col = max([max_col + 1] + [marker.col + 2 for marker in markers])
+        last_row = max([max_row + 1] + [marker.row + 2 for marker in markers])
+        widths = self.column_widths(ws, last_col)
+        heights = self.row_heights(ws, last_row)
+        
+        # Natural-size offsets relative to the print area origin
+        xs = [0.0] * (last_col + 2)
+        for col in range(1, last_col + 1):
+            xs[col + 1] = xs[col] + widths[col]
+        ys = [0.0] * (last_row + 2)
+        for row in range(1, last_row + 1):
+            ys[row + 1] = ys[row] + heights[row]
+        origin_x, origin_y = xs[min_col], ys[min_row]
+        natural_w, natural_h = xs[max_col + 1] - origin_x, ys[max_row + 1] - origin_y
+        if natural_w <= 0 or natural_h <= 0:
+            raise DirectRenderUnsupported("empty print area")
+        
+        # Draw at screen scale so text is rasterized crisp instead of resampled
+        scale = min(size[0] / natural_w, size[1] / natural_h)
+        sx = lambda col: round((xs[col] - origin_x) * scale)
+        sy = lambda row: round((ys[row] - origin_y) * scale)
+        canvas = Image.new("RGB", (max(1, round(natural_w * scale)), max(1, round(natural_h * scale))), "white")
+        draw = ImageDraw.Draw(canvas)
+        
+        merged_to = {}
+        covered = set()
+        for merged in ws.merged_cells.ranges:
+            merged_to[(merged.min_row, merged.min_col)] = (merged.max_row, merged.max_col)
+            covered.update(cell for cell in merged.cells if cell != (merged.min_row, merged.min_col))
+        
+        cells = [cell for row in ws.iter_rows(min_row=min_row, max_row=max_row,
+                                              min_col=min_col, max_col=max_col) for cell in row]
+        for cell in cells:
+            self.check_cell(cell)
+        
+        def cell_box(cell):
+            end_row, end_col = merged_to.get((cell.row, cell.column), (cell.row, cell.column))
+            return sx(cell.column), sy(cell.row), sx(end_col + 1), sy(end_row + 1)
+        
+        # Fills, then text, then borders, then pictures on top (Excel's paint order)
+        for cell in cells:
+            if (cell.row, cell.column) in covered or cell.fill is None or cell.fill.fill_type != "solid":
+                continue
+            color = self.resolve_color(cell.fill.fgColor, theme, None)
+            x0, y0, x1, y1 = cell_box(cell)
+            if color and x1 > x0 and y1 > y0:
+                draw.rectangle([x0, y0, x1 - 1, y1 - 1], fill=color)
+        
+        for cell in cells:
+            if (cell.row, cell.column) in covered or cell.value is None or not widths[cell.column]:
+                continue
+            self.draw_text(canvas, ws, cell, cell_box(cell), scale, theme, covered, max_col, sx)
+        
+        for cell in cells:
+            self.draw_borders(draw, cell, cell_box(cell) if (cell.row, cell.column) in merged_to
+                              else (sx(cell.column), sy(cell.row), sx(cell.column + 1), sy(cell.row + 1)),
+                              scale, theme)
+        
+        for img in ws._images:
+            self.draw_picture(canvas, img, xs, ys, origin_x, origin_y, scale)
+        return canvas
+    
+    def draw_text(self, canvas, ws, cell, box, scale, theme, covered, max_col, sx):
+        x0, y0, x1, y1 = box
+        text = self.format_value(cell)
+        if not text:
+            return
+        font_style = cell.font
+        px = (font_style.sz or 11) * 96 / 72 * scale * self.font_correction
+        font = self.font(font_style.b, font_style.i, max(1, round(px)))
+        color = self.resolve_color(font_style.color, theme, (0, 0, 0))
+        alignment = cell.alignment
+        is_number = isinstance(cell.value, (int, float, datetime, date)) and not isinstance(cell.value, bool)
+        horizontal = alignment.horizontal or ("right" if is_number else "left")
+        if horizontal in ("general", "fill", "justify", "distributed"):
+            horizontal = "right" if is_number else "left"
+        padding = self.CELL_PADDING * scale + (alignment.indent or 0) * 9 * scale
+        
+        right = x1
+        if alignment.wrap_text:
+            lines = self.wrap_lines(text, font, max(1, x1 - x0 - 2 * padding))
+        elif is_number:
+            # Numbers never overflow or get cut; Excel shows #### instead
+            lines = [text]
+            if font.getlength(text) > x1 - x0 - 2 * padding:
+                lines = ["#" * max(1, int((x1 - x0 - 2 * padding) // max(1, font.getlength("#"))))]
+        else:
+            # Unwrapped left-aligned text runs on over empty neighbours, like Excel
+            if horizontal == "left":
+                col = cell.column + 1
+                while (col <= max_col and (cell.row, col) not in covered
+                       and getattr(ws._cells.get((cell.row, col)), "value", None) is None):
+                    col += 1
+                right = sx(col)
+            lines = text.split("\n")
+        if right <= x0 or y1 <= y0:
+            return
+        
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
+        block = line_height * len(lines)
+        vertical = alignment.vertical or "bottom"
+        if vertical == "top":
+            y = padding
+        elif vertical in ("center", "justify", "distributed"):
+            y = (y1 - y0 - block) / 2
+        else:
+            y = y1 - y0 - block - padding
+        
+        # Draw on a crop of the cell area so text is clipped at the cell edges
+        layer = canvas.crop((x0, y0, right, y1))
+        draw = ImageDraw.Draw(layer)
+        for line in lines:
+            width = font.getlength(line)
+            if horizontal in ("center", "centerContinuous"):
+                x = (x1 - x0 - width) / 2
+            elif horizontal == "right":
+                x = x1 - x0 - width - padding
+            else:
+                x = padding
+            draw.text((x, y), line, font=font, fill=color)
+            if font_style.u:
+                draw.line([x, y + ascent + 1, x + width, y + ascent + 1], fill=color, width=max(1, round(scale)))
+            y += line_height
+        canvas.paste(layer, (x0, y0))
+    
+    def draw_borders(self, draw, cell, box, scale, theme):
+        x0, y0, x1, y1 = box
+        border = cell.border
+        for side, points in (("left", (x0, y0, x0, y1)), ("right", (x1, y0, x1, y1)),
+                             ("top", (x0, y0, x1, y0)), ("bottom", (x0, y1, x1, y1))):
+            edge = getattr(border, side)
+            if edge is None or not edge.style:
+                continue
+            width = max(1, round(self.BORDER_WIDTHS.get(edge.style, 1) * scale))
+            draw.line(points, fill=self.resolve_color(edge.color, theme, (0, 0, 0)), width=width)
+    
+    def draw_picture(self, canvas, img, xs, ys, origin_x, origin_y, scale):
+        anchor = img.anchor
+        if isinstance(anchor, str):
+            return
+        emu = self.EMU_PER_PIXEL
+        if hasattr(anchor, "_from"):
+            start = anchor._from
+            x = xs[start.col + 1] + start.colOff / emu
+            y = ys[start.row + 1] + start.rowOff / emu
+            if getattr(anchor, "to", None) is not None:
+                end = anchor.to
+                width = xs[end.col + 1] + end.colOff / emu - x
+                height = ys[end.row + 1] + end.rowOff / emu - y
+            else:
+                width, height = anchor.ext.cx / emu, anchor.ext.cy / emu
+        else:
+            x, y = anchor.pos.x / emu + origin_x, anchor.pos.y / emu + origin_y
+            width, height = anchor.ext.cx / emu, anchor.ext.cy / emu
+        
+        size = (round(width * scale), round(height * scale))
+        if size[0] <= 0 or size[1] <= 0:
+            return
+        with Image.open(io.BytesIO(img._data())) as picture:
+            picture = picture.convert("RGBA").resize(size, Image.LANCZOS)
+            canvas.paste(picture, (round((x - origin_x) * scale), round((y - origin_y) * scale)), picture)
+
+class ExcelConverter:
+    def __init__(self, cache_dir=None, workers=None, display_size=None):
+        cache_dir = cache_dir or resolve_cache_dir()
+        self.cache_dir = cache_dir
+        # Renders are rasterized straight to the display size; the profile keys that variant
+        self.display_size = display_size
+        self.raw_pixels = RAW_PIXEL_CACHE
+        cache_format = "rgba" if self.raw_pixels else "png"
+        if display_size:
+            self.render_profile = f"{cache_format}-{display_size[0]}x{display_size[1]}"
+        else:
+            self.render_profile = f"{cache_format}-150dpi"
+        os.makedirs(cache_dir, exist_ok=True)
+        # Scratch space on the cache filesystem so finished renders can be renamed into place
+        self.work_dir = os.path.join(cache_dir, "tmp")
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._check_tools()
+        self.render_index = RenderIndex(os.path.join(cache_dir, "render-index.sqlite3"))
+        self._remove_legacy_metadata()
+        self.share_io = ShareIO()
+        self.disk_cache = DiskCacheManager(cache_dir, self.render_index, share_io=self.share_io)
+        self.disk_cache.start()
+        self._log_cache_status()
+        self.sheet_catalog = SheetCatalog(os.path.join(cache_dir, "sheet-catalog.json"), self.share_io)
+        self.direct_renderer = None
+        if DIRECT_RENDER and DirectSheetRenderer.is_supported():
+            self.direct_renderer = DirectSheetRenderer()
+        elif DIRECT_RENDER:
+            logger.warning("openpyxl or sheet fonts not available - all sheets go through LibreOffice")
+
+        self.workers = conversion_worker_budget(workers if workers is not None else CONVERSION_WORKERS)
+        profile_root = os.path.join(cache_dir, "office-profiles")
+        self.office_pool = None
+        self.cold_profiles = queue.Queue()
+        if OfficeWorkerPool.is_supported():
+            self.office_pool = OfficeWorkerPool(profile_root, self.workers)
+            self.office_pool.start()
+        else:
+            logger.warning("python3-uno not available - using one libreoffice process per conversion")
+            # Parallel cold processes still need one profile each or they clash
+            for i in range(self.workers):
+                self.cold_profiles.put(os.path.join(profile_root, f"cold-{i}"))
+            # Cold exports are whole-sheet pages (print ranges ignored) - never mix them with pool renders
+            self.render_profile += "-wholesheet"
+
+        logger.info(f"Conversion workers: {self.workers}")
+        self.scheduler = ConversionScheduler(self.render_source, self.workers, batch_func=self.convert_folder)
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+        self.disk_cache.stop()
+        self.sheet_catalog.flush(force=True)
+        self.render_index.close()
+        self.share_io.shutdown()
+        if self.office_pool:
+            self.office_pool.shutdown()
+    
+    def _log_cache_status(self):
+        """Log cache index status on startup"""
+        try:
+            stats = self.render_index.stats()
+            failures = self.render_index.failure_stats()
+            logger.info(f"Cache directory: {self.cache_dir}")
+            logger.info(f"Cache contains: {stats['entries']} renders in {stats['artifacts']} files, "
+                        f"{stats['bytes'] / 1048576:.1f} MB")
+            logger.info(f"Known bad: {failures['failed']} failed renders ({failures['backing_off']} backing off), "
+                        f"{failures['missing_sheets']} missing sheets")
+        except Exception as e:
+            logger.error(f"Error checking cache status: {e}")
+    
+    def _remove_legacy_metadata(self):
+        """Drop .meta sidecars (and their unindexed PNGs) from before the render index"""
+        try:
+            legacy = [f for f in os.listdir(self.cache_dir) if f.endswith(".meta")]
+        except OSError:
+            return
+        for meta_name in legacy:
+            base = os.path.join(self.cache_dir, os.path.splitext(meta_name)[0])
+            for path in (base + ".meta", base + ".png"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if legacy:
+            logger.info(f"Removed {len(legacy)} legacy cache metadata files")
+    
+    def _check_tools(self):
+        """Verify required tools are available - checks both 'convert' and 'magick'"""
+        tools_required = ["libreoffice", "pdftoppm"]
+        tools_optional = ["convert", "magick"]
+        
+        missing = []
+        for tool in tools_required:
+            if not shutil.which(tool):
+                missing.append(tool)
+        
+        # Check for ImageMagick (either convert or magick)
+        self.imagemagick_cmd = None
+        if shutil.which("convert"):
+            self.imagemagick_cmd = "convert"
+        elif shutil.which("magick"):
+            self.imagemagick_cmd = "magick"
+        else:
+            missing.append("convert/magick")
+        
+        if missing:
+            logger.error(f"Missing required tools: {', '.join(missing)}")
+    
+    def sanitize_filename(self, name):
+        """Remove unsafe characters and add hash for uniqueness"""
+        safe = re.sub(r'[<>:"/\\|?*]', '_', name)[:80]
+        return safe
+    
+    def get_sheet_names(self, excel_path):
+        return self.sheet_catalog.get_sheet_names(excel_path)
+    
+    def match_sheet(self, sheet_names, sheet_type):
+        """Return the first sheet name matching a SHEET_MAPPING type"""
+        patterns = SHEET_MAPPING.get(sheet_type.lower(), [])
+        
+        for pattern in patterns:
+            for sheet_name in sheet_names:
+                if pattern.lower() in sheet_name.lower():
+                    logger.debug(f"Matched '{sheet_type}' to '{sheet_name}'")
+                    return sheet_name
+        return None
+    
+    def sheet_page(self, excel_path, sheet_name):
+        """Page label ("Front"/"Back") a cached sheet is displayed as, from the last known sheet list"""
+        sheet_names = self.sheet_catalog.cached_sheet_names(excel_path)
+        if not sheet_names:
+            return None
+        for sheet_type in SHEET_MAPPING:
+            if self.match_sheet(sheet_names, sheet_type) == sheet_name:
+                return sheet_type.capitalize()
+        return None
+    
+    def find_sheet(self, excel_path, sheet_type):
+        try:
+            try:
+                fingerprint = self.source_fingerprint(excel_path)
+            except OSError:
+                # Source unreachable (share not mounted yet) - match the last known sheet list
+                sheet_names = self.sheet_catalog.cached_sheet_names(excel_path)
+                if sheet_names is None:
+                    raise
+                return self.match_sheet(sheet_names, sheet_type)
+            if self.render_index.failure(fingerprint, f"type:{sheet_type}"):
+                logger.debug(f"No '{sheet_type}' sheet in {os.path.basename(excel_path)} (negative cache)")
+                return None
+            sheet_name = self.match_sheet(self.get_sheet_names(excel_path), sheet_type)
+            if sheet_name is None:
+                logger.warning(f"No sheet match for '{sheet_type}' in {os.path.basename(excel_path)}")
+                self.render_index.record_failure(fingerprint, f"type:{sheet_type}", "missing", excel_path)
+            return sheet_name
+        except Exception as e:
+            logger.error(f"Error reading sheets from {os.path.basename(excel_path)}: {e}")
+            return None
+    
+    def get_cache_path(self, excel_path, sheet_name, fingerprint=None):
+        """Content-addressed cache filename: identical workbooks map to the same file"""
+        fingerprint = fingerprint or self.source_fingerprint(excel_path)
+        safe_name = self.sanitize_filename(sheet_name)
+        content_hash = hashlib.sha1(f"{fingerprint}_{sheet_name}_{self.render_profile}".encode()).hexdigest()[:16]
+        extension = ".rgba" if self.raw_pixels else ".png"
+        return os.path.join(self.cache_dir, f"{safe_name}_{content_hash}{extension}")
+    
+    def source_fingerprint(self, excel_path):
+        """Content fingerprint of a source, recomputed only when its size or mtime changed"""
+        st = self.share_io.run("stat", os.stat, excel_path)
+        fingerprint = self.render_index.source_fingerprint(excel_path, st.st_size, st.st_mtime_ns)
+        if fingerprint is None:
+            fingerprint = self.share_io.run("read", content_fingerprint, excel_path)
+            self.render_index.record_source(excel_path, st.st_size, st.st_mtime_ns, fingerprint)
+        return fingerprint
+    
+    def sheet_keys(self, excel_path, sheet_names):
+        """Per-sheet delta keys for workbooks ({} for images or unreadable files)"""
+        if not excel_path.lower().endswith(".xlsx"):
+            return {}
+        try:
+            return self.share_io.run("read", sheet_fingerprints, excel_path, set(sheet_names))
+        except Exception as e:
+            logger.debug(f"Sheet keys unavailable for {os.path.basename(excel_path)}: {e}")
+            return {}
+    
+    def sheet_unchanged(self, excel_path, sheet_name, sheet_key):
+        return bool(sheet_key) and self.sheet_keys(excel_path, [sheet_name]).get(sheet_name) == sheet_key
+    
+    def adopt_shared_render(self, excel_path, sheet_name, fingerprint):
+        """Point this source at an existing render of identical content (copy or move)"""
+        match = self.render_index.find_by_fingerprint(fingerprint, sheet_name, self.render_profile)
+        if match is None:
+            return None, None
+        artifact, created, other_path = match
+        cache_path = os.path.join(self.cache_dir, artifact)
+        if not os.path.exists(cache_path):
+            return None, None
+        self.record_render(excel_path, sheet_name, cache_path, fingerprint, created=created,
+                           sheet_key=self.sheet_keys(excel_path, [sheet_name]).get(sheet_name))
+        logger.info(f"[SHARED] {os.path.basename(excel_path)} - {sheet_name} reuses render of {other_path}")
+        return cache_path, created
+    
+    def inspect_render(self, excel_path, sheet_name, touch=False):
+        """Return (cache_path, is_fresh, version) for the last good render of a sheet.
+        
+        A stale render (source modified, unreachable or older than
+        CACHE_STALE_DAYS) is still returned so it can be shown while a fresh
+        one is produced. version is the render's creation time. touch counts
+        the call as the page being shown.
+        """
+        row = self.render_index.lookup(excel_path, sheet_name, self.render_profile, touch)
+        cache_path = None
+        if row is not None:
+            artifact, cached_fingerprint, created, sheet_key = row
+            cache_path = os.path.join(self.cache_dir, artifact)
+            if not os.path.exists(cache_path):
+                self.render_index.remove(excel_path, sheet_name, self.render_profile)
+                cache_path = None
+        
+        try:
+            fingerprint = self.source_fingerprint(excel_path)
+        except OSError as e:
+            logger.debug(f"Error checking source: {e}")
+            return cache_path, False, created if cache_path else None
+        
+        if cache_path and cached_fingerprint != fingerprint and self.sheet_unchanged(excel_path, sheet_name,
+                                                                                     sheet_key):
+            # Workbook saved but this sheet (and everything it uses) is identical
+            self.render_index.rebind(excel_path, sheet_name, self.render_profile, fingerprint)
+            logger.info(f"[UNCHANGED] {os.path.basename(excel_path)} - {sheet_name}: keeping render")
+        elif cache_path is None or cached_fingerprint != fingerprint:
+            # New, moved or replaced file - identical content may be rendered already
+            shared_path, shared_created = self.adopt_shared_render(excel_path, sheet_name, fingerprint)
+            if shared_path:
+                cache_path, created = shared_path, shared_created
+            elif cache_path is None:
+                return None, False, None
+            else:
+                logger.info(f"Cache invalid: {os.path.basename(cache_path)} - source modified")
+                return cache_path, False, created
+        cache_name = os.path.basename(cache_path)
+        
+        age = timedelta(seconds=time.time() - created)
+        if age >= timedelta(days=CACHE_STALE_DAYS):
+            logger.info(f"Cache expired: {cache_name} - {age.days} days old")
+            return cache_path, False, created
+        
+        logger.debug(f"[CACHE HIT] {cache_name}")
+        return cache_path, True, created
+    
+    def lookup_render(self, excel_path, sheet_name):
+        """Return the cached render for a sheet if it is still valid, else None"""
+        cache_path, fresh, _ = self.inspect_render(excel_path, sheet_name)
+        return cache_path if fresh else None
+    
+    def record_render(self, excel_path, sheet_name, cache_path, fingerprint, render_ms=None, created=None,
+                      sheet_key=None):
+        try:
+            artifact = os.path.relpath(cache_path, self.cache_dir)
+            previous = self.render_index.artifact_of(excel_path, sheet_name, self.render_profile)
+            self.render_index.record(excel_path, sheet_name, self.render_profile, fingerprint, artifact,
+                                     os.path.getsize(cache_path), render_ms, created, sheet_key)
+            self.render_index.clear_failure(fingerprint, sheet_name)
+            if previous and previous != artifact:
+                # The render of the old content goes unless another source still shares it
+                self.disk_cache.release_artifact(previous)
+        except Exception as e:
+            logger.error(f"Error saving cache index entry: {e}")
+    
+    @staticmethod
+    def failure_backoff(attempts):
+        return min(FAILURE_BACKOFF_MAX, FAILURE_BACKOFF_BASE * 2 ** (attempts - 1))
+    
+    def record_failure(self, excel_path, sheet_names, fingerprint, error):
+        """Remember failed sheets so precache skips them until their backoff expires.
+        
+        On-screen requests always retry, so one transient failure never hides a page.
+        """
+        for sheet_name in sheet_names:
+            attempts, retry_after = self.render_index.record_failure(fingerprint, sheet_name, "failed", excel_path,
+                                                                     error, self.failure_backoff)
+        logger.warning(f"[FAILED] {os.path.basename(excel_path)} - {', '.join(sheet_names)}: {error} "
+                       f"(attempt {attempts}, retry in {(retry_after - time.time()) / 60:.0f} min)")
+    
+    def backing_off(self, excel_path, sheet_name, fingerprint, priority=PRIORITY_BACKGROUND):
+        if priority == PRIORITY_VISIBLE:
+            return False
+        failure = self.render_index.failure(fingerprint, sheet_name)
+        if failure and failure[0] == "failed" and failure[2] and failure[2] > time.time():
+            logger.debug(f"[BACKOFF] {os.path.basename(excel_path)} - {sheet_name}: {failure[3]} "
+                         f"(retry in {(failure[2] - time.time()) / 60:.0f} min)")
+            return True
+        return False
+    
+    def export_pdf(self, excel_path, out_dir, sheet_names, stop_event=None):
+        """Export sheets to PDF and return the sheet -> (pdf_path, page) map.
+        
+        The worker pool exports each sheet on its own; a cold libreoffice
+        process can only export the whole workbook, one page per sheet, so
+        its map is derived from the sheet order.
+        """
+        if self.office_pool:
+            exported = self.office_pool.convert_to_pdf(excel_path, out_dir, sheet_names, stop_event)
+            page_map = {name: (path, 1) for name, path in (exported or {}).items() if os.path.exists(path)}
+            if not page_map:
+                logger.error("No PDF generated")
+            return page_map
+        
+        if not shutil.which("libreoffice"):
+            raise OfficeUnavailable("libreoffice is not installed")
+        profile_dir = self.cold_profiles.get()
+        try:
+            result = run_cancellable(self.cold_office_cmd(profile_dir, out_dir, [excel_path]),
+                                     OFFICE_JOB_TIMEOUT, stop_event)
+        finally:
+            self.cold_profiles.put(profile_dir)
+        
+        if result.returncode != 0:
+            logger.error(f"LibreOffice failed: {result.stderr[:400]}")
+            return {}
+        
+        pdf_files = [f for f in os.listdir(out_dir) if f.endswith(".pdf")]
+        if not pdf_files:
+            logger.error("No PDF generated")
+            return {}
+        return self.workbook_page_map(excel_path, os.path.join(out_dir, pdf_files[0]), sheet_names)
+    
+    def cold_office_cmd(self, profile_dir, out_dir, excel_paths):
+        # Whole sheet export (LibreOffice 7.4+): every sheet, hidden ones included, becomes exactly one
+        # page in workbook order. Print ranges are ignored, hence the separate render profile.
+        pdf_filter = 'pdf:calc_pdf_Export:{"SinglePageSheets":{"type":"boolean","value":"true"}}'
+        return ["libreoffice", "--headless", "--invisible", "--nocrashreport",
+                "--nodefault", "--nofirststartwizard", "--nologo", "--norestore",
+                f"-env:UserInstallation=file://{quote(os.path.abspath(profile_dir))}",
+                "--convert-to", pdf_filter, "--outdir", out_dir, *excel_paths]
+    
+    def workbook_page_map(self, excel_path, pdf_path, sheet_names):
+        """Map sheets to pages of a whole-sheet PDF export (one page per sheet, hidden ones included).
         
-        self.cache[path] = photo
-        self.order.append(path)
-        logger.debug(f"Memory cache now contains {len(self.cache)}/{self.max_size} images")
-
-class ExcelConverter:
-    def __init__(self, cache_dir="/tmp/pi-photo-viewer-cache"):
-        self.cache_dir = cache_dir
-        self.conversion_lock = threading.Lock()
-        os.makedirs(cache_dir, exist_ok=True)
-        self._check_tools()
-        self._log_cache_status()
+        Returns {} when the page count does not match the sheet count (e.g. an
+        office without whole sheet export): every page could be misattributed.
+        """
+        all_sheets = self.share_io.run("read", SheetCatalog.read_sheet_names, excel_path)
+        page_count = self.pdf_page_count(pdf_path)
+        if page_count is None or page_count != len(all_sheets):
+            logger.error(f"{os.path.basename(excel_path)}: {page_count} PDF pages for {len(all_sheets)} "
+                         f"sheets - cannot map pages to sheets")
+            return {}
+        return {name: (pdf_path, all_sheets.index(name) + 1) for name in sheet_names if name in all_sheets}
     
-    def _log_cache_status(self):
-        """Log cache directory status on startup"""
+    def pdf_page_count(self, pdf_path):
         try:
-            files = os.listdir(self.cache_dir)
-            png_files = [f for f in files if f.endswith('.png')]
-            meta_files = [f for f in files if f.endswith('.meta')]
-            logger.info(f"Cache directory: {self.cache_dir}")
-            logger.info(f"Cache contains: {len(png_files)} PNG files, {len(meta_files)} metadata files")
+            result = run_cancellable(["pdfinfo", pdf_path], 10)
         except Exception as e:
-            logger.error(f"Error checking cache status: {e}")
+            logger.debug(f"pdfinfo failed: {e}")
+            return None
+        match = re.search(r"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+        return int(match.group(1)) if match else None
     
-    def _check_tools(self):
-        """Verify required tools are available - checks both 'convert' and 'magick'"""
-        tools_required = ["libreoffice", "pdftoppm"]
-        tools_optional = ["convert", "magick"]
+    def page_size_points(self, pdf_path, pdf_page):
+        """(width, height) of a PDF page in points, via pdfinfo"""
+        result = run_cancellable(["pdfinfo", "-f", str(pdf_page), "-l", str(pdf_page), pdf_path], 10)
+        match = re.search(rf"Page\s+{pdf_page} size:\s+([\d.]+) x ([\d.]+)", result.stdout)
+        if not match:
+            return None
+        return float(match.group(1)), float(match.group(2))
+    
+    def raster_scale_args(self, pdf_path, pdf_page):
+        """pdftoppm resolution arguments that make the page fit the display exactly"""
+        if not self.display_size:
+            return ["-r", "150"]
+        width, height = self.display_size
+        try:
+            size = self.page_size_points(pdf_path, pdf_page)
+        except Exception as e:
+            logger.debug(f"pdfinfo failed: {e}")
+            size = None
+        if not size:
+            return ["-scale-to", str(max(width, height))]
+        # Points are 1/72 inch; pick the DPI at which the page just fits the screen
+        dpi = 72 * min(width / size[0], height / size[1])
+        return ["-r", f"{dpi:.2f}"]
+    
+    def rasterize_page(self, pdf_path, pdf_page, cache_path, work_dir, stop_event=None):
+        """Render one PDF page (1-based) to cache_path via work_dir"""
+        temp_png = os.path.join(work_dir, os.path.splitext(os.path.basename(cache_path))[0] + ".png")
         
-        missing = []
-        for tool in tools_required:
-            if not shutil.which(tool):
-                missing.append(tool)
+        cmd = ["pdftoppm", "-png", "-f", str(pdf_page), "-l", str(pdf_page), "-singlefile",
+               *self.raster_scale_args(pdf_path, pdf_page), pdf_path, os.path.splitext(temp_png)[0]]
+        result = run_cancellable(cmd, 30, stop_event)
         
-        # Check for ImageMagick (either convert or magick)
-        self.imagemagick_cmd = None
-        if shutil.which("convert"):
-            self.imagemagick_cmd = "convert"
-        elif shutil.which("magick"):
-            self.imagemagick_cmd = "magick"
-        else:
-            missing.append("convert/magick")
+        if result.returncode != 0 and self.imagemagick_cmd:
+            logger.warning(f"pdftoppm failed: {result.stderr[:400]}, trying ImageMagick")
+            cmd = [self.imagemagick_cmd, "-density", "100", f"{pdf_path}[{pdf_page - 1}]"]
+            if self.display_size:
+                cmd += ["-resize", f"{self.display_size[0]}x{self.display_size[1]}"]
+            cmd.append(temp_png)
+            result = run_cancellable(cmd, 30, stop_event)
+            if result.returncode != 0:
+                logger.error(f"ImageMagick failed: {result.stderr[:400]}")
+                return False
         
-        if missing:
-            logger.error(f"Missing required tools: {', '.join(missing)}")
+        if not os.path.exists(temp_png):
+            return False
+        if cache_path.endswith(".rgba"):
+            temp_raw = os.path.splitext(temp_png)[0] + ".rgba"
+            with Image.open(temp_png) as img:
+                write_raw_pixels(img, temp_raw)
+            temp_png = temp_raw
+        # Only complete renders ever reach the cache directory
+        durable_replace(temp_png, cache_path)
+        return True
     
-    def sanitize_filename(self, name):
-        """Remove unsafe characters and add hash for uniqueness"""
-        safe = re.sub(r'[<>:"/\\|?*]', '_', name)[:80]
-        return safe
+    def convert_excel_to_png(self, excel_path, sheet_name, stop_event=None, priority=PRIORITY_VISIBLE):
+        """Convert Excel sheet to PNG with optional cancellation support"""
+        cache_path = self.lookup_render(excel_path, sheet_name)
+        if cache_path:
+            # Cache hit - return immediately (file exists on disk)
+            return cache_path
+        
+        job = self.submit_workbook(excel_path, [sheet_name], stop_event, priority)
+        rendered = self.scheduler.wait(job, stop_event)
+        if job.status == "cancelled" and not (stop_event and stop_event.is_set()):
+            # Joined a shared job that its other waiters cancelled - run our own
+            job = self.submit_workbook(excel_path, [sheet_name], stop_event, priority)
+            rendered = self.scheduler.wait(job, stop_event)
+        elif (sheet_name not in rendered and job.status == "done" and priority == PRIORITY_VISIBLE
+              and job.priority != PRIORITY_VISIBLE):
+            # Joined a running precache job, which leaves sheets in failure backoff alone - retry on screen
+            job = self.submit_workbook(excel_path, [sheet_name], stop_event, priority)
+            rendered = self.scheduler.wait(job, stop_event)
+        return rendered.get(sheet_name)
     
-    def find_sheet(self, excel_path, sheet_type):
+    def submit_workbook(self, excel_path, extra_sheets=(), stop_event=None, priority=PRIORITY_BACKGROUND):
+        """Queue a workbook (or plain image) render on the scheduler and return its job"""
+        return self.scheduler.submit(excel_path, extra_sheets, priority, stop_event)
+    
+    def render_source(self, source_path, extra_sheets=(), stop_event=None, priority=PRIORITY_BACKGROUND):
+        """Scheduler entry point: workbooks go through office, images are just scaled"""
+        if source_path.lower().endswith(".xlsx"):
+            return self.render_workbook(source_path, extra_sheets, stop_event, priority)
+        return self.render_image(source_path, stop_event, priority)
+    
+    def render_image(self, image_path, stop_event=None, priority=PRIORITY_BACKGROUND):
+        """Store a screen-sized copy of a plain image file in the render cache"""
+        if stop_event and stop_event.is_set():
+            raise ConversionCancelled("before start")
+        
+        cache_path = self.lookup_render(image_path, IMAGE_SHEET)
+        if cache_path:
+            return {IMAGE_SHEET: cache_path}
+        
+        fingerprint = self.source_fingerprint(image_path)
+        if self.backing_off(image_path, IMAGE_SHEET, fingerprint, priority):
+            return {}
+        cache_path = self.get_cache_path(image_path, IMAGE_SHEET, fingerprint)
+        target_size = self.render_size()
+        started = time.monotonic()
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(excel_path, read_only=True)
-            sheet_names = wb.sheetnames
-            wb.close()
-            
-            patterns = SHEET_MAPPING.get(sheet_type.lower(), [])
-            
-            for pattern in patterns:
-                for sheet_name in sheet_names:
-                    if pattern.lower() in sheet_name.lower():
-                        logger.debug(f"Matched '{sheet_type}' to '{sheet_name}'")
-                        return sheet_name
-            
-            logger.warning(f"No sheet match for '{sheet_type}' in {os.path.basename(excel_path)}")
-            return None
-        except Exception as e:
-            logger.error(f"Error reading sheets from {os.path.basename(excel_path)}: {e}")
-            return None
+            with Image.open(io.BytesIO(self.share_io.run("image", read_file, image_path))) as img:
+                # JPEG: let the decoder downscale in the DCT domain (1/2, 1/4, 1/8) before resampling
+                img.draft("RGB", target_size)
+                if img.mode not in ("RGB", "RGBA", "L"):
+                    img = img.convert("RGBA")
+                img.thumbnail(target_size, Image.LANCZOS)
+                self.save_render(img, cache_path)
+        except ShareUnavailable:
+            raise
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            self.record_failure(image_path, [IMAGE_SHEET], fingerprint, f"unreadable image: {e}")
+            return {}
+        
+        self.record_render(image_path, IMAGE_SHEET, cache_path, fingerprint,
+                           int((time.monotonic() - started) * 1000))
+        logger.info(f"[CACHED] {os.path.basename(cache_path)}")
+        self.disk_cache.enforce_quota()
+        return {IMAGE_SHEET: cache_path}
     
-    def get_cache_path(self, excel_path, sheet_name):
-        """Generate safe cache filename with hash"""
-        safe_name = self.sanitize_filename(f"{os.path.basename(excel_path)}_{sheet_name}")
-        content_hash = hashlib.sha1(f"{excel_path}_{sheet_name}".encode()).hexdigest()[:8]
-        return os.path.join(self.cache_dir, f"{safe_name}_{content_hash}.png")
+    def render_size(self):
+        """Bounding box renders drawn in-process are fitted to"""
+        return self.display_size or (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION)
     
-    def get_meta_path(self, cache_png_path):
-        """Get metadata file path"""
-        base = os.path.splitext(cache_png_path)[0]
-        return base + ".meta"
+    def save_render(self, img, cache_path):
+        """Write a PIL image into the cache in the configured format, atomically"""
+        fd, temp_path = tempfile.mkstemp(dir=self.work_dir)
+        os.close(fd)
+        try:
+            if self.raw_pixels:
+                write_raw_pixels(img, temp_path)
+            else:
+                img.save(temp_path, "PNG")
+            durable_replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
     
-    def get_sheet_index(self, excel_path, sheet_name):
+    def render_direct(self, excel_path, pending, fingerprint, rendered, sheet_keys=None):
+        """Draw pending sheets in-process; returns the ones left for LibreOffice"""
+        started = time.monotonic()
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(excel_path, read_only=True)
-            sheet_names = wb.sheetnames
-            wb.close()
-            return sheet_names.index(sheet_name) if sheet_name in sheet_names else None
+            workbook = io.BytesIO(self.share_io.run("workbook", read_file, excel_path))
+            images = self.direct_renderer.render_sheets(excel_path, [name for name, _ in pending],
+                                                        self.render_size(), workbook)
+        except ShareUnavailable:
+            raise
         except Exception as e:
-            logger.error(f"Error getting sheet index: {e}")
-            return None
+            logger.warning(f"[DIRECT] {os.path.basename(excel_path)}: {e} - using LibreOffice")
+            return pending
+        if not images:
+            return pending
+        
+        render_ms = int((time.monotonic() - started) * 1000 / len(images))
+        remaining = []
+        for sheet_name, cache_path in pending:
+            if sheet_name not in images:
+                remaining.append((sheet_name, cache_path))
+                continue
+            self.save_render(images[sheet_name], cache_path)
+            self.record_render(excel_path, sheet_name, cache_path, fingerprint, render_ms,
+                               sheet_key=(sheet_keys or {}).get(sheet_name))
+            logger.info(f"[CACHED] {os.path.basename(cache_path)} (direct, {render_ms} ms)")
+            rendered[sheet_name] = cache_path
+        return remaining
     
-    def is_cache_valid(self, cache_path, source_excel_path=None):
-        """Check if cache is valid with detailed logging"""
-        cache_name = os.path.basename(cache_path)
+    def pending_sheets(self, excel_path, sheet_names, fingerprint, extra_sheets=(), rendered=None,
+                       priority=PRIORITY_BACKGROUND):
+        """[(sheet_name, cache_path)] of mapped (plus extra) sheets without a valid render.
         
-        # Check if cache file exists
-        if not os.path.exists(cache_path):
-            return False
+        Sheets that are cached already are added to rendered when given;
+        sheets whose last render failed are left out until their backoff ends,
+        unless the request is for the screen.
+        """
+        wanted = [self.match_sheet(sheet_names, sheet_type) for sheet_type in SHEET_MAPPING]
+        wanted = [name for name in wanted if name] + [name for name in extra_sheets if name in sheet_names]
+        pending = []
+        for sheet_name in dict.fromkeys(wanted):
+            cache_path = self.lookup_render(excel_path, sheet_name)
+            if cache_path:
+                if rendered is not None:
+                    rendered[sheet_name] = cache_path
+            elif not self.backing_off(excel_path, sheet_name, fingerprint, priority):
+                pending.append((sheet_name, self.get_cache_path(excel_path, sheet_name, fingerprint)))
+        return pending
+    
+    def precache_folder(self, paths, stop_event=None, priority=PRIORITY_BACKGROUND):
+        """Render every file of one model folder; logs folder throughput in files/min"""
+        if not paths:
+            return
+        started = time.monotonic()
+        if BATCH_FOLDER_CONVERSION and not self.office_pool:
+            mode = "batch"
+            while True:
+                job = self.scheduler.submit_batch(paths, priority, stop_event)
+                self.scheduler.wait(job, stop_event)
+                if not job.preempted or (stop_event and stop_event.is_set()):
+                    break
+                # An on-screen request took the worker - requeue the rest (finished renders are skipped)
+        else:
+            mode = "per-file"
+            # Queue the whole folder at once so every conversion worker stays busy
+            jobs = [self.submit_workbook(path, stop_event=stop_event, priority=priority) for path in paths]
+            for job in jobs:
+                self.scheduler.wait(job, stop_event)
+                if stop_event and stop_event.is_set():
+                    return
+        if stop_event and stop_event.is_set():
+            return
+        elapsed = time.monotonic() - started
+        logger.info(f"[PRECACHE] {os.path.basename(os.path.dirname(paths[0]))}: {len(paths)} files in "
+                    f"{elapsed:.1f}s ({len(paths) / max(elapsed, 0.001) * 60:.1f} files/min, {mode})")
+    
+    def convert_folder(self, paths, stop_event=None):
+        """Bring a folder up to date with a single libreoffice run for all changed workbooks.
         
-        # Check source modification time if provided
-        if source_excel_path and os.path.exists(source_excel_path):
+        Runs as one scheduler job. Images and sheets the direct renderer can
+        draw are handled first; the remaining workbooks are exported in one
+        invocation and their pages rasterized in parallel on the worker slots
+        the scheduler leaves idle. Returns the number of pages rendered.
+        """
+        rendered = 0
+        batch = {}
+        for path in paths:
+            if stop_event and stop_event.is_set():
+                return rendered
             try:
-                excel_mod_time = os.path.getmtime(source_excel_path)
-                meta_path = self.get_meta_path(cache_path)
-                
-                if os.path.exists(meta_path):
-                    try:
-                        with open(meta_path, 'r') as f:
-                            cached_time = float(f.read().strip())
-                        
-                        if excel_mod_time > cached_time:
-                            logger.info(f"Cache invalid: {cache_name} - source modified")
-                            return False
-                    except Exception as e:
-                        logger.debug(f"Metadata read error: {e}")
+                if not path.lower().endswith(".xlsx"):
+                    self.render_image(path, stop_event)
+                    continue
+                fingerprint = self.source_fingerprint(path)
+                sheet_names = self.readable_sheet_names(path, fingerprint)
+                if sheet_names is None:
+                    continue
+                pending = self.pending_sheets(path, sheet_names, fingerprint)
+                sheet_keys = self.sheet_keys(path, [name for name, _ in pending]) if pending else {}
+                if pending and self.direct_renderer:
+                    done = {}
+                    pending = self.render_direct(path, pending, fingerprint, done, sheet_keys)
+                    rendered += len(done)
+                if pending:
+                    batch[path] = (fingerprint, pending, sheet_keys)
+            except ConversionCancelled:
+                return rendered
             except Exception as e:
-                logger.debug(f"Error checking source time: {e}")
+                logger.error(f"Batch precache error for {os.path.basename(path)}: {e}")
         
-        # Check file age
+        if batch:
+            try:
+                rendered += self.batch_export(batch, stop_event)
+            except ConversionCancelled:
+                return rendered
+            except Exception as e:
+                logger.error(f"Batch conversion error: {e}")
+        self.disk_cache.enforce_quota()
+        return rendered
+    
+    def batch_export(self, batch, stop_event=None):
+        """Export {path: (fingerprint, pending, sheet_keys)} with one office process, rasterize in parallel"""
+        if not shutil.which("libreoffice"):
+            raise OfficeUnavailable("libreoffice is not installed")
+        logger.info(f"[CONVERTING] batch of {len(batch)} workbooks")
+        temp_dir = tempfile.mkdtemp(dir=self.work_dir)
         try:
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_path))
-            if file_age >= timedelta(days=CACHE_STALE_DAYS):
-                logger.info(f"Cache expired: {cache_name} - {file_age.days} days old")
-                return False
+            started = time.monotonic()
+            profile_dir = self.cold_profiles.get()
+            try:
+                result = run_cancellable(self.cold_office_cmd(profile_dir, temp_dir, list(batch)),
+                                         OFFICE_JOB_TIMEOUT * len(batch), stop_event)
+                if result.returncode != 0:
+                    logger.error(f"LibreOffice batch failed: {result.stderr[:400]}")
+            except subprocess.TimeoutExpired:
+                # Keep whatever was exported before the hang; the rest is marked failed below
+                logger.error(f"LibreOffice batch timed out after {OFFICE_JOB_TIMEOUT * len(batch)}s")
+            finally:
+                self.cold_profiles.put(profile_dir)
             
-            logger.debug(f"[CACHE HIT] {cache_name}")
-            return True
-        except Exception as e:
-            logger.error(f"Cache validation error: {e}")
-            return False
+            tasks = []
+            for path, (fingerprint, pending, sheet_keys) in batch.items():
+                pdf_path = os.path.join(temp_dir, os.path.splitext(os.path.basename(path))[0] + ".pdf")
+                if not os.path.exists(pdf_path):
+                    self.record_failure(path, [name for name, _ in pending], fingerprint, "no PDF from batch export")
+                    continue
+                page_map = self.workbook_page_map(path, pdf_path, [name for name, _ in pending])
+                unmapped = [name for name, _ in pending if name not in page_map]
+                if unmapped:
+                    self.record_failure(path, unmapped, fingerprint, "sheet missing from PDF export")
+                tasks += [(path, fingerprint, sheet_keys.get(name), name, cache_path, page_map[name])
+                          for name, cache_path in pending if name in page_map]
+            if not tasks:
+                return 0
+            export_ms = (time.monotonic() - started) * 1000 / len(tasks)
+            
+            def rasterize(task):
+                path, fingerprint, sheet_key, sheet_name, cache_path, (pdf_path, pdf_page) = task
+                page_started = time.monotonic()
+                if not self.rasterize_page(pdf_path, pdf_page, cache_path, temp_dir, stop_event):
+                    self.record_failure(path, [sheet_name], fingerprint, "page rasterization failed")
+                    return 0
+                render_ms = int(export_ms + (time.monotonic() - page_started) * 1000)
+                self.record_render(path, sheet_name, cache_path, fingerprint, render_ms, sheet_key=sheet_key)
+                logger.info(f"[CACHED] {os.path.basename(cache_path)}")
+                return 1
+            
+            return self.rasterize_on_idle_workers(rasterize, tasks)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def rasterize_on_idle_workers(self, rasterize, tasks):
+        """Run rasterize over tasks on this job's thread plus helpers for idle dispatchers.
+        
+        Helper n only takes another page while at least n conversion workers
+        sit idle, so queued and on-screen jobs get their slots back at once.
+        """
+        remaining = queue.Queue()
+        for task in tasks:
+            remaining.put(task)
+        results, errors = [], []
+        
+        def run(index):
+            while not errors:
+                if index and self.scheduler.idle_workers() < index:
+                    return
+                try:
+                    task = remaining.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results.append(rasterize(task))
+                except Exception as e:
+                    errors.append(e)
+        
+        helpers = [threading.Thread(target=run, args=(index,), daemon=True) for index in range(1, self.workers)]
+        for helper in helpers:
+            helper.start()
+        run(0)
+        for helper in helpers:
+            helper.join()
+        if errors:
+            raise errors[0]
+        return sum(results)
     
-    def save_metadata(self, cache_path, source_excel_path):
-        """Save source modification time"""
+    def readable_sheet_names(self, excel_path, fingerprint, priority=PRIORITY_BACKGROUND):
+        """Sheet names, or None for a workbook that cannot be opened (recorded as a failure)"""
+        if self.backing_off(excel_path, "*", fingerprint, priority):
+            return None
         try:
-            excel_mod_time = os.path.getmtime(source_excel_path)
-            meta_path = self.get_meta_path(cache_path)
-            with open(meta_path, 'w') as f:
-                f.write(str(excel_mod_time))
+            return self.get_sheet_names(excel_path)
+        except ShareUnavailable:
+            raise
         except Exception as e:
-            logger.error(f"Error saving metadata: {e}")
+            self.record_failure(excel_path, ["*"], fingerprint, f"unreadable workbook: {e}")
+            return None
     
-    def convert_excel_to_png(self, excel_path, sheet_name, stop_event=None):
-        """Convert Excel sheet to PNG with optional cancellation support"""
-        with self.conversion_lock:
-            # Check if we should stop before starting
-            if stop_event and stop_event.is_set():
-                logger.debug("Conversion cancelled before start")
-                return None
+    def record_unfinished(self, excel_path, pending, rendered, fingerprint, error):
+        unfinished = [name for name, _ in pending if name not in rendered]
+        if fingerprint and unfinished:
+            self.record_failure(excel_path, unfinished, fingerprint, error)
+    
+    def render_workbook(self, excel_path, extra_sheets=(), stop_event=None, priority=PRIORITY_BACKGROUND):
+        """Render all mapped sheets (plus extra_sheets), in-process where possible,
+        the rest from a single PDF export.
+        
+        Runs on a scheduler thread. Returns {sheet_name: cache_path} for every
+        sheet that is cached afterwards.
+        """
+        # Check if we should stop before starting
+        if stop_event and stop_event.is_set():
+            raise ConversionCancelled("before start")
+        
+        temp_dir = None
+        rendered = {}
+        pending = []
+        fingerprint = None
+        try:
+            # Fingerprint before exporting so an edit during conversion invalidates the render
+            fingerprint = self.source_fingerprint(excel_path)
+            sheet_names = self.readable_sheet_names(excel_path, fingerprint, priority)
+            if sheet_names is None:
+                return rendered
+            pending = self.pending_sheets(excel_path, sheet_names, fingerprint, extra_sheets, rendered, priority)
             
-            temp_dir = None
-            try:
-                cache_path = self.get_cache_path(excel_path, sheet_name)
-                
-                if self.is_cache_valid(cache_path, excel_path):
-                    # Cache hit - return immediately (file exists on disk)
-                    return cache_path
-                
-                # Cache miss - need to convert
-                logger.info(f"[CONVERTING] {os.path.basename(excel_path)} - {sheet_name}")
-                sheet_index = self.get_sheet_index(excel_path, sheet_name)
-                if sheet_index is None:
+            for sheet_name in extra_sheets:
+                if sheet_name not in sheet_names:
                     logger.error(f"Sheet '{sheet_name}' not found in workbook")
-                    return None
-                
-                # Check stop event before expensive operations
-                if stop_event and stop_event.is_set():
-                    logger.info("Conversion cancelled during processing")
-                    return None
-                
-                temp_dir = tempfile.mkdtemp()
-                output_prefix = os.path.splitext(cache_path)[0]
-                
-                cmd = ["libreoffice", "--headless", "--invisible", "--nocrashreport",
-                       "--nodefault", "--nofirststartwizard", "--nologo", "--norestore",
-                       "--convert-to", "pdf", "--outdir", temp_dir, excel_path]
-                result = subprocess.run(cmd, capture_output=True, timeout=45, text=True)
-                
-                if result.returncode != 0:
-                    logger.error(f"LibreOffice failed: {result.stderr[:400]}")
-                    return None
-                
-                # Check stop event after LibreOffice
+            
+            if not pending:
+                return rendered
+            
+            # Cache miss - need to convert
+            logger.info(f"[CONVERTING] {os.path.basename(excel_path)} - "
+                        f"{', '.join(name for name, _ in pending)}")
+            sheet_keys = self.sheet_keys(excel_path, [name for name, _ in pending])
+            
+            if self.direct_renderer:
+                pending = self.render_direct(excel_path, pending, fingerprint, rendered, sheet_keys)
+                if not pending:
+                    self.disk_cache.enforce_quota()
+                    return rendered
+            
+            # Check stop event before expensive operations
+            if stop_event and stop_event.is_set():
+                raise ConversionCancelled("before export")
+            
+            temp_dir = tempfile.mkdtemp(dir=self.work_dir)
+            started = time.monotonic()
+            page_map = self.export_pdf(excel_path, temp_dir, [name for name, _ in pending], stop_event)
+            if not page_map:
+                self.record_failure(excel_path, [name for name, _ in pending], fingerprint, "no PDF generated")
+                return rendered
+            export_ms = (time.monotonic() - started) * 1000 / len(pending)
+            
+            for sheet_name, cache_path in pending:
+                # Check stop event after LibreOffice and between pages
                 if stop_event and stop_event.is_set():
-                    logger.info("Conversion cancelled after PDF generation")
-                    return None
+                    raise ConversionCancelled("after PDF generation")
                 
-                pdf_files = [f for f in os.listdir(temp_dir) if f.endswith(".pdf")]
-                if not pdf_files:
-                    logger.error("No PDF generated")
-                    return None
-                
-                pdf_path = os.path.join(temp_dir, pdf_files[0])
-                pdf_page = sheet_index + 1
-                
-                cmd = ["pdftoppm", "-png", "-f", str(pdf_page), "-l", str(pdf_page),
-                       "-singlefile", "-r", "150", pdf_path, output_prefix]
-                result = subprocess.run(cmd, capture_output=True, timeout=30, text=True)
-                
-                if result.returncode != 0 and self.imagemagick_cmd:
-                    logger.warning(f"pdftoppm failed: {result.stderr[:400]}, trying ImageMagick")
-                    cmd = [self.imagemagick_cmd, "-density", "100", f"{pdf_path}[{sheet_index}]", cache_path]
-                    result = subprocess.run(cmd, capture_output=True, timeout=30, text=True)
-                    if result.returncode != 0:
-                        logger.error(f"ImageMagick failed: {result.stderr[:400]}")
-                        return None
-                
-                if os.path.exists(cache_path):
-                    self.save_metadata(cache_path, excel_path)
+                if sheet_name not in page_map:
+                    self.record_failure(excel_path, [sheet_name], fingerprint, "sheet missing from PDF export")
+                    continue
+                started = time.monotonic()
+                pdf_path, pdf_page = page_map[sheet_name]
+                if self.rasterize_page(pdf_path, pdf_page, cache_path, temp_dir, stop_event):
+                    render_ms = int(export_ms + (time.monotonic() - started) * 1000)
+                    self.record_render(excel_path, sheet_name, cache_path, fingerprint, render_ms,
+                                       sheet_key=sheet_keys.get(sheet_name))
                     logger.info(f"[CACHED] {os.path.basename(cache_path)}")
-                    return cache_path
+                    rendered[sheet_name] = cache_path
                 else:
-                    logger.error(f"Conversion completed but file not found: {cache_path}")
-                
-                return None
+                    self.record_failure(excel_path, [sheet_name], fingerprint, "page rasterization failed")
             
-            except subprocess.TimeoutExpired:
-                logger.error("Conversion timeout")
-                return None
-            except Exception as e:
-                logger.error(f"Conversion error: {e}")
-                return None
-            finally:
-                if temp_dir and os.path.exists(temp_dir):
-                    try:
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                    except Exception:
-                        pass
+            self.disk_cache.enforce_quota()
+            return rendered
+        
+        except ConversionCancelled:
+            raise
+        except subprocess.TimeoutExpired:
+            logger.error("Conversion timeout")
+            self.record_unfinished(excel_path, pending, rendered, fingerprint, "timeout")
+            return rendered
+        except ShareUnavailable as e:
+            # The share is at fault, not the workbook - no failure backoff
+            logger.warning(f"Share unavailable while converting {os.path.basename(excel_path)}: {e}")
+            return rendered
+        except OfficeUnavailable as e:
+            # Same for a broken office installation
+            logger.error(f"Cannot convert {os.path.basename(excel_path)}: {e}")
+            return rendered
+        except Exception as e:
+            logger.error(f"Conversion error: {e}")
+            self.record_unfinished(excel_path, pending, rendered, fingerprint, str(e)[:200])
+            return rendered
+        finally:
+            # Runs right after a cancel kill, so no temp files outlive the job
+            if temp_dir and os.path.exists(temp_dir):
+                try:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                except Exception:
+                    pass
 
 class FullscreenImageApp:
     def __init__(self, root):
@@ -649,31 +3338,48 @@ class FullscreenImageApp:
         
         self.image_label = tk.Label(root, bg="black", fg="white", font=("Helvetica", 24))
         self.image_label.pack(expand=True, fill="both")
+        self.updated_label = tk.Label(root, text="✔ UPDATED", bg="#059669", fg="white",
+                                      font=("Helvetica", 18, "bold"), padx=15, pady=5)
+        self.updated_timer = None
+        self.share_status_label = tk.Label(root, text="", fg="white",
+                                           font=("Helvetica", 18, "bold"), padx=15, pady=5)
         self.image_label.bind("<Button-1>", lambda e: self.expand_controls())
-        self.image_label.config(image="", text="Waiting for network drive...\n(polling every 10 seconds)")
+        self.image_label.config(image="", text="Waiting for network drive...")
 
         self.current_page = "Front"
         self.is_expanded = False
         self.current_file_path = None
         self.current_model_path = None
-        self.files_list = []
+        # Display loads of the current selection; set once the user moves on
+        self.display_stop = threading.Event()
+        self.display_path = None
+        self.files_index = {}
         self.image_cache = ImageCache()
-        self.excel_converter = ExcelConverter()
+        self.render_versions = {}
+        self.excel_converter = ExcelConverter(display_size=self.get_display_size())
+        self.share_catalog = ShareCatalog(NETWORK_BASE_PATH,
+                                          os.path.join(self.excel_converter.cache_dir, "share-snapshot.json"),
+                                          self.excel_converter.share_io)
+        threading.Thread(target=self.warm_start, daemon=True).start()
 
         # Thread management with explicit per-thread stop events
         self.bg_precache_thread = None
         self.bg_precache_stop = None
         self.fg_precache_thread = None
         self.fg_precache_stop = None
-        self.polling_thread = None
-        self.polling_stop = threading.Event()
+        self.share_monitor = ShareMonitor(NETWORK_BASE_PATH, self.on_share_state)
 
         self.network_available = False
         self.set_online_state(False)
 
         if DEPARTMENTS:
             self.dept_var.set(DEPARTMENTS[0])
-            self.root.after_idle(self.start_network_polling)
+            if self.share_catalog.folders:
+                # Offline-first: browse the last known tree and cached renders while the share mounts
+                self.share_catalog.set_offline(True)
+                self.set_online_state(False)
+                self.root.after_idle(self.on_dept_select)
+            self.root.after_idle(self.share_monitor.start)
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
@@ -727,6 +3433,7 @@ class FullscreenImageApp:
     
     def on_page_click(self, page):
         self.current_page = page
+        self.begin_display(self.current_file_path)
         for front, back in [(self.front_button, self.back_button),
                            (self.front_button_exp, self.back_button_exp)]:
             if page == "Front":
@@ -744,8 +3451,8 @@ class FullscreenImageApp:
     def on_close(self):
         logger.info("App closing - setting stop flags")
 
-        # Stop polling
-        self.polling_stop.set()
+        # Stop share monitoring
+        self.share_monitor.stop()
         
         # Stop background precache
         if self.bg_precache_stop:
@@ -759,6 +3466,11 @@ class FullscreenImageApp:
         if self.fg_precache_thread and self.fg_precache_thread.is_alive():
             self.fg_precache_thread.join(timeout=2.0)
         
+        logger.info(f"Memory cache stats: {self.image_cache.stats()}")
+        logger.info(f"Disk cache stats: {self.excel_converter.disk_cache.stats()}")
+        logger.info(f"Share I/O stats: {self.excel_converter.share_io.stats()}")
+        self.share_catalog.flush(force=True)
+        self.excel_converter.shutdown()
         self.root.quit()
     
     def set_online_state(self, online: bool):
@@ -766,53 +3478,58 @@ class FullscreenImageApp:
 
         def apply_state():
             self.network_available = online
-            state = "normal" if online else "disabled"
+            # The snapshot keeps the tree browsable while the share is down
+            browsable = online or (self.share_catalog.offline and bool(self.share_catalog.folders))
+            state = "normal" if browsable else "disabled"
             for dropdown in self.touch_dropdowns:
                 dropdown.set_state(state)
 
-            if not online:
-                self.image_label.config(image="", text="Waiting for network drive...\n(polling every 10 seconds)")
+            if not browsable:
+                self.image_label.config(image="", text="Waiting for network drive...")
 
         if threading.current_thread() is threading.main_thread():
             apply_state()
         else:
             self.root.after(0, apply_state)
 
-    def start_network_polling(self):
-        """Start polling for network drive availability"""
-        logger.info("Starting network drive polling")
-        self.polling_thread = threading.Thread(target=self._poll_network_drive, daemon=True)
-        self.polling_thread.start()
+    def on_share_state(self, state, previous):
+        """Move the UI between online, degraded and offline as the share monitor reports"""
+        if state == ShareMonitor.OFFLINE:
+            # Browse the snapshot and cached renders; precache would only block on the dead share
+            self.share_catalog.set_offline(True)
+            for stop_event in (self.bg_precache_stop, self.fg_precache_stop):
+                if stop_event:
+                    stop_event.set()
+            self.set_online_state(False)
+        elif previous in (None, ShareMonitor.OFFLINE):
+            # Reconcile in place instead of resetting the selection
+            self.excel_converter.share_io.reset()
+            self.share_catalog.set_offline(False)
+            self.set_online_state(True)
+            self.root.after(0, lambda: self.on_dept_select(None, keep_selection=True))
+        self.root.after(0, lambda: self.show_share_status(state))
     
-    def _poll_network_drive(self):
-        """Poll network drive every 10 seconds until available"""
-        while not self.polling_stop.is_set():
-            try:
-                if os.path.exists(NETWORK_BASE_PATH) and os.path.isdir(NETWORK_BASE_PATH):
-                    logger.info("Network drive found!")
-                    self.root.after(0, lambda: self.set_online_state(True))
-                    self.root.after(0, lambda: self.on_dept_select(None))
-                    return
-                else:
-                    logger.debug("Network drive not available yet")
-                    self.root.after(0, lambda: self.set_online_state(False))
-            except Exception as e:
-                logger.debug(f"Network poll error: {e}")
-                self.root.after(0, lambda: self.set_online_state(False))
-            
-            for _ in range(100):
-                if self.polling_stop.is_set():
-                    return
-                time.sleep(0.1)
+    def show_share_status(self, state):
+        if state == ShareMonitor.DEGRADED:
+            self.share_status_label.config(text="⚠ NETWORK SLOW", bg="#D97706")
+        elif state == ShareMonitor.OFFLINE and self.share_catalog.folders:
+            self.share_status_label.config(text="✖ OFFLINE - SAVED PAGES", bg="#DC2626")
+        else:
+            self.share_status_label.place_forget()
+            return
+        self.share_status_label.place(relx=0.0, rely=0.0, x=20, y=20, anchor="nw")
+        self.share_status_label.lift()
     
-    def on_dept_select(self, _value=None):
+    def on_dept_select(self, _value=None, keep_selection=False):
         logger.info(f"Department: {self.dept_var.get()}")
-        threading.Thread(target=self._dept_select_worker, daemon=True).start()
+        if not keep_selection:
+            self.begin_display(None)
+        threading.Thread(target=self._dept_select_worker, args=(keep_selection,), daemon=True).start()
     
-    def _dept_select_worker(self):
+    def _dept_select_worker(self, keep_selection=False):
         """Background worker for department selection"""
         try:
-            self.update_models()
+            self.update_models(keep_selection)
         except Exception as e:
             logger.error(f"Error updating models: {e}")
             self.root.after(0, lambda: self.image_label.config(image="", text="Network drive not available"))
@@ -826,7 +3543,10 @@ class FullscreenImageApp:
         
         # Start new background precache with fresh stop event
         dept = self.dept_var.get()
-        if dept:
+        if dept and not self.share_catalog.offline:
+            dept_path = self.share_catalog.dept_path(dept)
+            self.excel_converter.disk_cache.pin([dept_path])
+
             logger.info(f"Starting bg precache for {dept}")
             self.bg_precache_stop = threading.Event()
             self.bg_precache_thread = threading.Thread(
@@ -839,57 +3559,51 @@ class FullscreenImageApp:
         if self.is_expanded:
             self.root.after(0, self.reset_collapse_timer)
     
-    def update_models(self):
+    def update_models(self, keep_selection=False):
         dept = self.dept_var.get()
         if not dept:
             self.root.after(0, lambda: self.model_dropdown.set_values([]))
             return
         
-        # Check if this is a special department with a custom path
-        if dept in SPECIAL_DEPT_PATHS:
-            dept_path = os.path.join(NETWORK_BASE_PATH, SPECIAL_DEPT_PATHS[dept])
-        else:
-            dept_path = os.path.join(NETWORK_BASE_PATH, dept)
-        
-        if not os.path.exists(dept_path):
-            logger.error(f"Department path not found: {dept_path}")
+        try:
+            models = self.share_catalog.models(dept)
+        except FileNotFoundError:
+            logger.error(f"Department path not found: {self.share_catalog.dept_path(dept)}")
             self.root.after(0, lambda: self.model_dropdown.set_values([]))
             self.root.after(0, lambda: self.image_label.config(image="", text="Department not accessible"))
             return
-        
-        try:
-            # Get all subdirectories
-            all_models = [d for d in os.listdir(dept_path)
-                         if os.path.isdir(os.path.join(dept_path, d))]
-            
-            # Filter out excluded folders for this department
-            excluded = EXCLUDED_MODEL_FOLDERS.get(dept, [])
-            models = sorted([m for m in all_models if m not in excluded])
-            
-            self.root.after(0, lambda: self.model_dropdown.set_values(models))
-            if models:
-                self.root.after(0, lambda first=models[0]: self._select_model(first))
         except Exception as e:
             logger.error(f"Error listing models: {e}")
             self.root.after(0, lambda: self.model_dropdown.set_values([]))
             self.root.after(0, lambda: self.image_label.config(image="", text="Error reading department"))
+            return
+        
+        self.root.after(0, lambda: self.model_dropdown.set_values(models))
+        if models:
+            current = self.model_var.get()
+            model = current if keep_selection and current in models else models[0]
+            self.root.after(0, lambda: self._select_model(model, keep_selection))
 
-    def on_model_select(self, _value=None):
+    def on_model_select(self, _value=None, keep_selection=False):
+        threading.Thread(target=self._model_select_worker, args=(keep_selection,), daemon=True).start()
+    
+    def _model_select_worker(self, keep_selection=False):
+        """Background worker for model selection - a hung share must not block the UI thread"""
         # Stop old foreground precache
         if self.fg_precache_stop and self.fg_precache_thread:
             logger.debug("Stopping old fg precache thread")
             self.fg_precache_stop.set()
             self.fg_precache_thread.join(timeout=1.0)
         
-        self.update_files()
+        model_path = self.update_files(keep_selection)
         
         # Start new foreground precache
-        if self.current_model_path:
-            logger.info(f"Starting fg precache for {os.path.basename(self.current_model_path)}")
+        if model_path and not self.share_catalog.offline:
+            logger.info(f"Starting fg precache for {os.path.basename(model_path)}")
             self.fg_precache_stop = threading.Event()
             self.fg_precache_thread = threading.Thread(
                 target=self.precache_model_aggressive,
-                args=(self.current_model_path, self.fg_precache_stop),
+                args=(model_path, self.fg_precache_stop),
                 daemon=True
             )
             self.fg_precache_thread.start()
@@ -897,73 +3611,78 @@ class FullscreenImageApp:
         if self.is_expanded:
             self.root.after(0, self.reset_collapse_timer)
     
-    def update_files(self):
+    def update_files(self, keep_selection=False):
+        """List the selected model folder (off the UI thread) and show it; returns the folder path"""
         dept = self.dept_var.get()
         model = self.model_var.get()
         if not dept or not model:
-            self.file_dropdown.set_values([])
-            self.files_list = []
-            return
-        
-        # Check if this is a special department with a custom path
-        if dept in SPECIAL_DEPT_PATHS:
-            dept_path = os.path.join(NETWORK_BASE_PATH, SPECIAL_DEPT_PATHS[dept])
-        else:
-            dept_path = os.path.join(NETWORK_BASE_PATH, dept)
-        
-        self.current_model_path = os.path.join(dept_path, model)
+            self.current_model_path = None
+            self.root.after(0, lambda: self.show_files(None, {}))
+            return None
         
-        if not os.path.exists(self.current_model_path):
-            logger.error(f"Model path not found: {self.current_model_path}")
-            self.file_dropdown.set_values([])
-            self.files_list = []
-            self.root.after(0, lambda: self.image_label.config(image="", text="Model not accessible"))
-            return
+        model_path = os.path.join(self.share_catalog.dept_path(dept), model)
+        self.current_model_path = model_path
         
         try:
-            self.files_list = sorted([os.path.join(self.current_model_path, f)
-                                     for f in os.listdir(self.current_model_path)
-                                     if os.path.isfile(os.path.join(self.current_model_path, f))
-                                     and f.lower().endswith(SUPPORTED_FORMATS)])
-            names = [os.path.splitext(os.path.basename(f))[0] for f in self.files_list]
-            self.file_dropdown.set_values(names)
-            if names:
-                self.file_dropdown.set(names[0])
-                self.on_file_select(names[0])
-            else:
-                self.root.after(0, lambda: self.image_label.config(image="", text="No files found"))
+            files_index = self.share_catalog.files(model_path)
+        except FileNotFoundError:
+            logger.error(f"Model path not found: {model_path}")
+            self.root.after(0, lambda: self.show_files(model_path, {}, error="Model not accessible"))
+            return None
         except Exception as e:
             logger.error(f"Error listing files: {e}")
-            self.file_dropdown.set_values([])
-            self.files_list = []
-            self.root.after(0, lambda: self.image_label.config(image="", text="Error reading files"))
+            self.root.after(0, lambda: self.show_files(model_path, {}, error="Error reading files"))
+            return None
+        
+        self.root.after(0, lambda: self.show_files(model_path, files_index, keep_selection))
+        return model_path
+    
+    def show_files(self, model_path, files_index, keep_selection=False, error=None):
+        if model_path != self.current_model_path:
+            # A newer model selection is being listed
+            return
+        self.files_index = files_index
+        names = list(files_index)
+        self.file_dropdown.set_values(names)
+        if error:
+            self.image_label.config(image="", text=error)
+        elif names:
+            current = self.file_var.get()
+            name = current if keep_selection and current in names else names[0]
+            self.file_dropdown.set(name)
+            self.on_file_select(name, keep_selection)
+        elif model_path:
+            self.image_label.config(image="", text="No files found")
 
-    def _select_model(self, value):
+    def _select_model(self, value, keep_selection=False):
         self.model_dropdown.set(value)
-        self.on_model_select(value)
+        self.on_model_select(value, keep_selection)
     
-    def on_file_select(self, _value=None):
+    def on_file_select(self, _value=None, keep_selection=False):
         name = self.file_var.get()
-        if not name or not self.files_list:
+        if not name or not self.files_index:
             return
         
-        for f in self.files_list:
-            if os.path.splitext(os.path.basename(f))[0] == name:
-                self.current_file_path = f
-                break
-        else:
+        path = self.files_index.get(name)
+        if path is None:
             self.root.after(0, lambda: self.image_label.config(image="", text="File not found"))
             return
+        # Reconciling after an outage keeps the page and control bar the operator had
+        reconciled = keep_selection and path == self.current_file_path
+        self.current_file_path = path
+        self.begin_display(path)
         
         if self.current_file_path.lower().endswith(".xlsx"):
             for btn in [self.front_button, self.back_button, self.front_button_exp, self.back_button_exp]:
                 btn.config(state="normal")
-            self.on_page_click("Front")
+            self.on_page_click(self.current_page if reconciled else "Front")
         else:
             for btn in [self.front_button, self.back_button, self.front_button_exp, self.back_button_exp]:
                 btn.config(state="disabled")
             self.display_file(self.current_file_path, "Image")
         
+        if reconciled:
+            return
         self.root.after(2000, self.collapse_controls)
         if self.is_expanded:
             self.reset_collapse_timer()
@@ -980,6 +3699,9 @@ class FullscreenImageApp:
             if path == self.current_file_path:
                 self.root.after(0, lambda: (self.image_label.config(image=cached, text=""),
                                            setattr(self.image_label, 'image', cached)))
+            # Freshness check runs behind the displayed image
+            threading.Thread(target=self.revalidate, args=(path, page, cache_key, None, self.display_stop, True),
+                             daemon=True).start()
         else:
             # Need to load from disk (may be in disk cache but still needs PIL processing)
             logger.info(f"Loading from disk: {os.path.basename(path)} - {page}")
@@ -987,9 +3709,21 @@ class FullscreenImageApp:
                 self.root.after(0, lambda: self.image_label.config(image="", text=f"Loading {page}..."))
             else:
                 self.root.after(0, lambda: self.image_label.config(image="", text="Loading..."))
-            threading.Thread(target=self.load_file, args=(path, page, cache_key), daemon=True).start()
+            threading.Thread(target=self.load_file, args=(path, page, cache_key, self.display_stop),
+                             daemon=True).start()
+    
+    def begin_display(self, path):
+        """Cancel display loads of a previous selection.
+        
+        Front and back come from one workbook job, so switching pages of the
+        same file keeps its conversion running.
+        """
+        if path is None or path != self.display_path:
+            self.display_stop.set()
+            self.display_stop = threading.Event()
+            self.display_path = path
     
-    def load_file(self, path, page, cache_key):
+    def load_file(self, path, page, cache_key, stop_event=None):
         """Load and display file - FIXED: proper return after error"""
         if path != self.current_file_path:
             logger.debug("Load cancelled - selection changed")
@@ -1008,61 +3742,164 @@ class FullscreenImageApp:
                     if path == self.current_file_path:
                         self.root.after(0, lambda: self.image_label.config(image="", text="Sheet not found"))
                     return  # FIXED: This return was missing!
-                
-                png_path = self.excel_converter.convert_excel_to_png(path, sheet)
-                
-                if not png_path:
-                    logger.error(f"Conversion failed for {os.path.basename(path)} - {sheet}")
-                    if path == self.current_file_path:
-                        self.root.after(0, lambda: self.image_label.config(image="", text=f"Failed to convert {page}"))
-                    return
-                
-                img = Image.open(png_path)
             else:
-                img = Image.open(path)
+                sheet = IMAGE_SHEET
             
-            screen_width = self.root.winfo_screenwidth()
-            available_height = self.root.winfo_screenheight() - self.control_bar_collapsed_height
+            png_path, fresh, version = self.excel_converter.inspect_render(path, sheet, touch=True)
+            if png_path and not fresh:
+                # Stale-while-revalidate: show the last good render now, refresh behind it
+                logger.info(f"[STALE] Showing last render of {os.path.basename(path)} - {sheet}")
+                self.show_render(path, page, cache_key, png_path, version)
+                self.revalidate(path, page, cache_key, sheet, stop_event)
+                return
             
-            max_dim = (min(screen_width, MAX_IMAGE_DIMENSION),
-                      min(available_height, MAX_IMAGE_DIMENSION))
-            img.thumbnail(max_dim, Image.LANCZOS)
+            if not png_path and self.share_catalog.offline:
+                if path == self.current_file_path:
+                    self.root.after(0, lambda: self.image_label.config(
+                        image="", text=f"{page} not cached yet\nWaiting for network drive..."))
+                return
+            if not png_path:
+                png_path = self.excel_converter.convert_excel_to_png(path, sheet, stop_event)
+            if stop_event and stop_event.is_set():
+                logger.debug("Load cancelled - selection changed")
+                return
             
-            photo = ImageTk.PhotoImage(img)
-            self.image_cache.put(cache_key, photo)
-            logger.info(f"Stored in memory cache: {os.path.basename(path)} - {page}")
+            if not png_path and sheet == IMAGE_SHEET:
+                # Scaled copy failed - still show the original
+                png_path = path
+            elif not png_path:
+                logger.error(f"Conversion failed for {os.path.basename(path)} - {sheet}")
+                if path == self.current_file_path:
+                    self.root.after(0, lambda: self.image_label.config(image="", text=f"Failed to convert {page}"))
+                return
             
-            if path == self.current_file_path:
-                self.root.after(0, lambda: (self.image_label.config(image=photo, text=""),
-                                           setattr(self.image_label, 'image', photo)))
+            _, _, version = self.excel_converter.inspect_render(path, sheet, touch=True)
+            self.show_render(path, page, cache_key, png_path, version)
         except Exception as e:
             logger.error(f"Error loading file {os.path.basename(path)}: {e}")
             if path == self.current_file_path:
                 self.root.after(0, lambda: self.image_label.config(image="", text=f"Error loading:\n{os.path.basename(path)}"))
     
+    def get_display_size(self):
+        """Largest image size that fits above the collapsed control bar"""
+        screen_width = self.root.winfo_screenwidth()
+        available_height = self.root.winfo_screenheight() - self.control_bar_collapsed_height
+        
+        return (min(screen_width, MAX_IMAGE_DIMENSION),
+                min(available_height, MAX_IMAGE_DIMENSION))
+    
+    def prepare_photo(self, image_path):
+        """Decode an image and scale it to the display area"""
+        if image_path.endswith(".rgba"):
+            img = load_raw_pixels(image_path)
+        else:
+            if image_path.startswith(self.excel_converter.cache_dir):
+                img = Image.open(image_path)
+            else:
+                # Original on the share (its scaled copy failed)
+                img = Image.open(io.BytesIO(self.excel_converter.share_io.run("image", read_file, image_path)))
+            # Cheap JPEG shrink while decoding when we fall back to an original
+            img.draft("RGB", self.get_display_size())
+        # No-op for renders that were rasterized at display size already
+        img.thumbnail(self.get_display_size(), Image.LANCZOS)
+        
+        return ImageTk.PhotoImage(img)
+    
+    def show_render(self, path, page, cache_key, image_path, version=None, updated=False):
+        """Scale an image for the screen, cache it and display it if still current"""
+        photo = self.prepare_photo(image_path)
+        self.image_cache.put(cache_key, photo)
+        self.render_versions[cache_key] = version
+        logger.info(f"Stored in memory cache: {os.path.basename(path)} - {page}")
+        
+        if path == self.current_file_path and (page == self.current_page or page == "Image"):
+            def apply():
+                self.image_label.config(image=photo, text="")
+                self.image_label.image = photo
+                if updated:
+                    self.show_updated_indicator()
+            self.root.after(0, apply)
+    
+    def warm_start(self):
+        """Decode the most-used cached pages into memory, without touching the share"""
+        started = time.monotonic()
+        loaded = 0
+        converter = self.excel_converter
+        for source_path, sheet, artifact, created in converter.render_index.most_used(converter.render_profile):
+            if loaded >= WARM_START_PAGES:
+                break
+            page = "Image" if sheet == IMAGE_SHEET else converter.sheet_page(source_path, sheet)
+            if not page:
+                continue
+            try:
+                photo = self.prepare_photo(os.path.join(converter.cache_dir, artifact))
+            except Exception as e:
+                logger.debug(f"Warm start skipped {artifact}: {e}")
+                continue
+            cache_key = f"{source_path}_{page}"
+            self.image_cache.put(cache_key, photo)
+            self.render_versions[cache_key] = created
+            loaded += 1
+        logger.info(f"Warm start: {loaded} pages decoded in {time.monotonic() - started:.1f}s")
+    
+    def revalidate(self, path, page, cache_key, sheet=None, stop_event=None, touch=False):
+        """Re-render a displayed sheet if its source changed, then swap it in place.
+        
+        touch counts the check as a showing (memory cache hits in display_file).
+        """
+        try:
+            if sheet is None and not path.lower().endswith(".xlsx"):
+                sheet = IMAGE_SHEET
+            elif sheet is None:
+                sheet_type = page.lower() if page != "Image" else "front"
+                sheet = self.excel_converter.find_sheet(path, sheet_type)
+                if not sheet:
+                    return
+            
+            png_path, fresh, version = self.excel_converter.inspect_render(path, sheet, touch)
+            if fresh and version == self.render_versions.get(cache_key):
+                return
+            
+            if not fresh and self.share_catalog.offline:
+                # Nothing to render from yet - the share coming up revalidates this page
+                return
+            if not fresh:
+                logger.info(f"[REVALIDATE] {os.path.basename(path)} - {sheet}")
+                png_path = self.excel_converter.convert_excel_to_png(path, sheet, stop_event)
+                if not png_path:
+                    # Keep showing the last good render
+                    return
+                _, _, version = self.excel_converter.inspect_render(path, sheet)
+            
+            if version != self.render_versions.get(cache_key):
+                logger.info(f"[UPDATED] {os.path.basename(path)} - {sheet}")
+                self.show_render(path, page, cache_key, png_path, version, updated=True)
+        except Exception as e:
+            logger.error(f"Revalidation error for {os.path.basename(path)}: {e}")
+    
+    def show_updated_indicator(self):
+        self.updated_label.place(relx=1.0, rely=0.0, x=-20, y=20, anchor="ne")
+        self.updated_label.lift()
+        if self.updated_timer:
+            self.root.after_cancel(self.updated_timer)
+        self.updated_timer = self.root.after(UPDATED_INDICATOR_MS, self.hide_updated_indicator)
+    
+    def hide_updated_indicator(self):
+        self.updated_timer = None
+        self.updated_label.place_forget()
+    
     def precache_dept(self, dept, stop_event):
         """Background precaching for entire department"""
         logger.info(f"=== BG PRECACHE START: {dept} ===")
         
-        # Check if this is a special department with a custom path
-        if dept in SPECIAL_DEPT_PATHS:
-            dept_path = os.path.join(NETWORK_BASE_PATH, SPECIAL_DEPT_PATHS[dept])
-        else:
-            dept_path = os.path.join(NETWORK_BASE_PATH, dept)
-        
-        if not os.path.exists(dept_path):
+        dept_path = self.share_catalog.dept_path(dept)
+        try:
+            models = self.share_catalog.models(dept)
+        except FileNotFoundError:
             logger.warning(f"Dept path not found: {dept_path}")
             return
         
         try:
-            # Get all model directories
-            all_models = [d for d in os.listdir(dept_path)
-                         if os.path.isdir(os.path.join(dept_path, d))]
-            
-            # Filter out excluded folders for this department
-            excluded = EXCLUDED_MODEL_FOLDERS.get(dept, [])
-            models = [m for m in all_models if m not in excluded]
-            
             logger.info(f"BG precache: {len(models)} models in {dept}")
             
             for idx, model in enumerate(models, 1):
@@ -1073,21 +3910,13 @@ class FullscreenImageApp:
                 model_path = os.path.join(dept_path, model)
                 
                 try:
-                    files = [os.path.join(model_path, f)
-                            for f in os.listdir(model_path)
-                            if f.lower().endswith(".xlsx")]
+                    # Also keeps the catalog current: one stat per model folder, re-listed only if changed
+                    files = list(self.share_catalog.files(model_path).values())
                     
-                    for excel_file in files:
-                        if stop_event.is_set():
-                            return
-                        
-                        for sheet_type in ["front", "back"]:
-                            if stop_event.is_set():
-                                return
-                            
-                            sheet = self.excel_converter.find_sheet(excel_file, sheet_type)
-                            if sheet:
-                                self.excel_converter.convert_excel_to_png(excel_file, sheet, stop_event)
+                    self.excel_converter.precache_folder(files, stop_event, PRIORITY_DEPT)
+                    if stop_event.is_set():
+                        logger.info(f"BG precache cancelled during {model}")
+                        return
                 except Exception as e:
                     logger.debug(f"BG precache error in {model}: {e}")
                     continue
@@ -1101,35 +3930,190 @@ class FullscreenImageApp:
         model_name = os.path.basename(model_path)
         logger.info(f"=== FG PRECACHE START: {model_name} ===")
         
-        if not os.path.exists(model_path):
+        try:
+            files = list(self.share_catalog.files(model_path).values())
+        except FileNotFoundError:
             logger.warning(f"Model path not found: {model_path}")
             return
         
         try:
-            files = [os.path.join(model_path, f)
-                    for f in os.listdir(model_path)
-                    if f.lower().endswith(".xlsx")]
             
-            logger.info(f"FG precache: {len(files)} Excel files in {model_name}")
+            logger.info(f"FG precache: {len(files)} files in {model_name}")
             
-            for idx, excel_file in enumerate(files, 1):
-                if stop_event.is_set():
-                    logger.info(f"FG precache cancelled at file {idx}/{len(files)}")
-                    return
-                
-                for sheet_type in ["front", "back"]:
-                    if stop_event.is_set():
-                        return
-                    
-                    sheet = self.excel_converter.find_sheet(excel_file, sheet_type)
-                    if sheet:
-                        self.excel_converter.convert_excel_to_png(excel_file, sheet, stop_event)
+            self.excel_converter.precache_folder(files, stop_event, PRIORITY_MODEL)
+            if stop_event.is_set():
+                logger.info(f"FG precache cancelled in {model_name}")
+                return
         except Exception as e:
             logger.error(f"FG precache error: {e}")
         
         logger.info(f"=== FG PRECACHE COMPLETE: {model_name} ===")
 
+def run_worker_benchmark(folder, max_workers=4):
+    """Convert every workbook in folder with 1..max_workers workers and report throughput"""
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".xlsx"))
+    if not files:
+        print(f"No .xlsx files in {folder}")
+        return
+    
+    cache_dir = tempfile.mkdtemp(prefix="opstandard-bench-")
+    baseline = None
+    try:
+        print(f"Benchmark: {len(files)} workbooks from {folder}")
+        for workers in range(1, max_workers + 1):
+            # Empty render cache per run; office profiles are kept so only the first run creates them
+            for entry in os.scandir(cache_dir):
+                if entry.name == "office-profiles":
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            converter = ExcelConverter(cache_dir=cache_dir, workers=workers)
+            # Office scaling is what is measured; the GIL-bound in-process renderer would skew it
+            converter.direct_renderer = None
+            if converter.office_pool:
+                converter.office_pool.ready.wait(OFFICE_STARTUP_TIMEOUT * workers)
+            
+            started = time.monotonic()
+            jobs = [converter.submit_workbook(path) for path in files]
+            pages = sum(len(converter.scheduler.wait(job)) for job in jobs)
+            elapsed = time.monotonic() - started
+            converter.shutdown()
+            
+            rate = len(files) / elapsed * 60
+            baseline = baseline or rate
+            line = (f"workers={converter.workers} requested={workers}: {elapsed:.1f}s, "
+                    f"{len(files)} files, {pages} pages, {rate:.1f} files/min, x{rate / baseline:.2f}")
+            print(line)
+            logger.info(f"[BENCHMARK] {line}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def run_pixel_benchmark(image_path, rounds=20):
+    """Compare loading a page from PNG with loading it from the raw-pixel format"""
+    work_dir = tempfile.mkdtemp(prefix="opstandard-bench-")
+    try:
+        png_path = os.path.join(work_dir, "page.png")
+        raw_path = os.path.join(work_dir, "page.rgba")
+        with Image.open(image_path) as img:
+            img.convert("RGBA").save(png_path)
+            write_raw_pixels(img, raw_path)
+        
+        def timed(load):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                load()
+            return (time.perf_counter() - started) * 1000 / rounds
+        
+        # load() forces a full decode; the raw image is touched via a pixel read
+        png_ms = timed(lambda: Image.open(png_path).load())
+        raw_ms = timed(lambda: load_raw_pixels(raw_path).getpixel((0, 0)))
+        print(f"PNG:  {png_ms:.2f} ms/load, {os.path.getsize(png_path) / 1024:.0f} KB on disk")
+        print(f"RGBA: {raw_ms:.2f} ms/load, {os.path.getsize(raw_path) / 1024:.0f} KB on disk")
+        print(f"Speedup: x{png_ms / raw_ms:.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_renderer_comparison(folder, size=(1820, 980)):
+    """Render each mapped sheet in folder both in-process and via LibreOffice; report speed and similarity"""
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".xlsx"))
+    if not files:
+        print(f"No .xlsx files in {folder}")
+        return
+    
+    def trimmed(img):
+        # Drop page margins so both renders are compared on their content only
+        img = img.convert("L")
+        box = ImageChops.difference(img, Image.new("L", img.size, 255)).getbbox()
+        return img.crop(box) if box else img
+    
+    cache_dir = tempfile.mkdtemp(prefix="opstandard-bench-")
+    try:
+        converter = ExcelConverter(cache_dir=cache_dir, workers=1, display_size=size)
+        if not converter.direct_renderer:
+            print("Direct renderer not available (openpyxl or fonts missing)")
+            converter.shutdown()
+            return
+        if converter.office_pool:
+            converter.office_pool.ready.wait(OFFICE_STARTUP_TIMEOUT)
+        
+        direct_times, office_times, scores, fallbacks = [], [], [], 0
+        for path in files:
+            sheet_names = converter.get_sheet_names(path)
+            wanted = [name for name in (converter.match_sheet(sheet_names, t) for t in SHEET_MAPPING) if name]
+            if not wanted:
+                continue
+            
+            started = time.monotonic()
+            direct = converter.direct_renderer.render_sheets(path, wanted, size)
+            direct_ms = (time.monotonic() - started) * 1000
+            
+            temp_dir = tempfile.mkdtemp(dir=converter.work_dir)
+            started = time.monotonic()
+            compared = [name for name in wanted if name in direct]
+            page_map = {}
+            if compared:
+                try:
+                    page_map = converter.export_pdf(path, temp_dir, compared)
+                except OfficeUnavailable as e:
+                    logger.error(f"LibreOffice unavailable for {path}: {e}")
+            for sheet_name in wanted:
+                name = os.path.basename(path)
+                if sheet_name not in direct:
+                    fallbacks += 1
+                    print(f"{name} - {sheet_name}: fallback to LibreOffice")
+                    continue
+                office_path = os.path.join(temp_dir, f"{len(office_times)}.png")
+                page_started = time.monotonic()
+                if sheet_name not in page_map or not converter.rasterize_page(*page_map[sheet_name],
+                                                                              office_path, temp_dir):
+                    print(f"{name} - {sheet_name}: direct {direct_ms / len(wanted):.0f} ms, LibreOffice failed")
+                    continue
+                office_ms = (page_started - started) * 1000 / len(wanted) + (time.monotonic() - page_started) * 1000
+                
+                office_img = trimmed(Image.open(office_path))
+                direct_img = trimmed(direct[sheet_name]).resize(office_img.size, Image.LANCZOS)
+                diff = ImageStat.Stat(ImageChops.difference(direct_img, office_img)).mean[0]
+                score = 100 - diff / 255 * 100
+                direct_times.append(direct_ms / len(wanted))
+                office_times.append(office_ms)
+                scores.append(score)
+                print(f"{name} - {sheet_name}: direct {direct_times[-1]:.0f} ms, "
+                      f"LibreOffice {office_ms:.0f} ms, similarity {score:.1f}%")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        converter.shutdown()
+        
+        if scores:
+            line = (f"{len(scores)} sheets compared, {fallbacks} fallbacks: direct "
+                    f"{sum(direct_times) / len(direct_times):.0f} ms/sheet vs LibreOffice "
+                    f"{sum(office_times) / len(office_times):.0f} ms/sheet, "
+                    f"mean similarity {sum(scores) / len(scores):.1f}% (min {min(scores):.1f}%)")
+        else:
+            line = f"No sheets compared, {fallbacks} fallbacks"
+        print(line)
+        logger.info(f"[BENCHMARK] {line}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = FullscreenImageApp(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Pi Standards Viewer")
+    parser.add_argument("--benchmark-workers", metavar="FOLDER",
+                        help="measure conversion throughput for 1..4 workers on a folder of workbooks")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--benchmark-pixels", metavar="IMAGE",
+                        help="compare PNG and raw-pixel cache load times for one rendered page")
+    parser.add_argument("--compare-renderers", metavar="FOLDER",
+                        help="compare in-process and LibreOffice renders (speed and similarity) for a folder")
+    args = parser.parse_args()
+    
+    if args.benchmark_workers:
+        run_worker_benchmark(args.benchmark_workers, args.max_workers)
+    elif args.benchmark_pixels:
+        run_pixel_benchmark(args.benchmark_pixels)
+    elif args.compare_renderers:
+        run_renderer_comparison(args.compare_renderers)
+    else:
+        root = tk.Tk()
+        app = FullscreenImageApp(root)
+        root.mainloop()
@@ -24,13 +24,14 @@ APP_DIR="$HOME_DIR/pi_photo_app"
 APP_SCRIPT_PATH="$APP_DIR/image_viewer.py"
 LOG_DIR="/var/log/pi-photo-viewer"
 LOG_FILE="$LOG_DIR/app.log"
+CACHE_DIR="/var/cache/pi-photo-viewer"
 
 echo "Installing for user: $REAL_USER"
 echo ""
 
 echo "[1/7] Installing system packages..."
 apt-get update
-apt-get install -y python3-tk python3-pil.imagetk inotify-tools libreoffice poppler-utils imagemagick curl
+apt-get install -y python3-tk python3-pil.imagetk inotify-tools libreoffice python3-uno fonts-liberation poppler-utils imagemagick curl
 
 if [ $? -ne 0 ]; then
     echo "Error: Failed to install packages."
@@ -58,9 +59,13 @@ cat > /etc/logrotate.d/pi-photo-viewer << 'EOF'
 }
 EOF
 
-echo "[4/7] Creating application directory..."
+echo "[4/7] Creating application and cache directories..."
 mkdir -p "$APP_DIR"
 chown "$REAL_USER":"$REAL_USER" "$APP_DIR"
+# Persistent render cache (survives reboots, unlike /tmp)
+mkdir -p "$CACHE_DIR"
+chown "$REAL_USER":"$REAL_USER" "$CACHE_DIR"
+chmod 755 "$CACHE_DIR"
 
 echo "[5/7] Downloading Python application from GitHub..."
 echo "URL: $PYTHON_FILE_URL"
@@ -80,25 +85,8 @@ chmod +x "$APP_SCRIPT_PATH"
 
 echo "[6/7] Configuring systemd services..."
 
-# LibreOffice persistent listener - DISABLED
-# We'll use fresh processes instead to avoid hangs
-# cat > /etc/systemd/system/libreoffice-listener.service << 'EOF'
-# [Unit]
-# Description=LibreOffice Headless Listener
-# Before=pi-photo-viewer.service
-#
-# [Service]
-# Type=simple
-# User=pi
-# ExecStart=/usr/bin/libreoffice --headless --accept="socket,host=localhost,port=2002;urp;StarOffice.ComponentContext" --nofirststartwizard --nologo --norestore --disable-extension-update
-# Restart=always
-# RestartSec=10
-# TimeoutStopSec=15
-# KillMode=mixed
-#
-# [Install]
-# WantedBy=multi-user.target
-# EOF
+# No global LibreOffice listener service: the viewer supervises its own pool
+# of headless workers (one profile each, restarted on hang) via python3-uno.
 
 # Main application service
 cat > /etc/systemd/system/pi-photo-viewer.service << EOF